@@ -1,4 +1,4 @@
-from flask import Flask, request
+from flask import Flask, g, request
 from flask.wrappers import Response
 from flask_cors import cross_origin
 from beginnergen import generate_sentence_beginner, conseguirPalabraRandom
@@ -6,19 +6,30 @@ from dotenv import load_dotenv
 from concurrent.futures import Future, ThreadPoolExecutor
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from diskcache import Cache
-import hashlib, requests, os, sys, io, base64, numpy as np
-from PIL import Image, ImageOps
-from paddleocr import PaddleOCR
+from hotcache import HotCache, disk_usage
+from ltbatch import LTBatcher
+from pronpool import PronEngine
+from registry import MODELS, parse_warmup, READY
+from ocrpool import OCRPool, OCRBusy
+from leases import Leases
+from cachestore import cache_key, build_payload, is_full, make_store
+from metrics import (
+    timed, instrument, cache_event, lt_status, coalesced, sample, observe_request, render,
+    start_timings, timings, server_timing,
+    PRON_QUEUE, OCR_PENDING,
+)
+import hashlib, hmac, requests, os, sys, io, base64, numpy as np
+from PIL import Image
 from ipa import pronounce, space_chinese_for_flutter, space_japanese_for_flutter
-from langdetect import DetectorFactory, detect_langs
-import orjson, threading, unicodedata, re
+import langid
+from ocrtext import reading_order, clean_by_lang, strip_digits
+import contextvars, orjson, threading, time
 
-_WS = re.compile(r"\s+")
-_PUNCT = ".,;:!?…'\"()[]{}"
-
-DetectorFactory.seed = 0
+# Espaciado CJK para Flutter (MeCab/jieba), medido como etapa propia en /metrics
+space_japanese_for_flutter = timed("space_ja")(space_japanese_for_flutter)
+space_chinese_for_flutter = timed("space_zh")(space_chinese_for_flutter)
 
 EN = "en"
 
@@ -27,25 +38,140 @@ MAX_LONG_SIDE = 1920
 
 load_dotenv()
 
+# LTENGINE_URI apunta a otra instancia (p.ej. el LTEngine falso de bench/)
 if sys.platform == "win32":
-    URI = "http://localhost:5050".rstrip("/")
+    URI = os.getenv("LTENGINE_URI", "http://localhost:5050").rstrip("/")
     ESPEAK_DIR = os.getenv("PHONEMIZER_ESPEAK_DIR", r"C:\Program Files\eSpeak NG")
     ESPEAK_DLL = os.path.join(ESPEAK_DIR, "libespeak-ng.dll")
     os.environ.setdefault("PHONEMIZER_ESPEAK_LIBRARY", ESPEAK_DLL)
 else:
-    URI = "http://0.0.0.0:5050".rstrip("/")
+    URI = os.getenv("LTENGINE_URI", "http://0.0.0.0:5050").rstrip("/")
     os.environ.setdefault("PHONEMIZER_ESPEAK_LIBRARY", "/usr/lib/x86_64-linux-gnu/libespeak-ng.so.1")
     
 REQUEST_TIMEOUT = 60
+# Directorio de la caché en disco (payloads, OCR y, en ipa.py, el léxico)
+CACHE_DIR = os.getenv("CACHE_DIR", "./.cache")
 MAX_WORKERS = 4
 MAX_SENTENCE_LENGTH = 50
+MAX_BATCH_ITEMS = 64
+
+# OCR en su propio pool: OCR_WORKERS hilos (una instancia de PaddleOCR cada uno) y hasta
+# OCR_QUEUE fotos esperando; con la cola llena /ocr responde 503 + Retry-After al momento
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+OCR_QUEUE = int(os.getenv("OCR_QUEUE", "4"))
+OCR_RETRY_AFTER = int(os.getenv("OCR_RETRY_AFTER", "2"))
+OCR_BATCH_MAX = int(os.getenv("OCR_BATCH_MAX", "8"))
+
+def _new_paddle():
+    from paddleocr import PaddleOCR
+    return PaddleOCR()
+
+def _load_ocr() -> OCRPool:
+    return OCRPool(_new_paddle, OCR_WORKERS, OCR_QUEUE).warm()
+
+# Los modelos se cargan al primer uso: importar app (p.ej. desde precache_sentences.py)
+# no carga OCR ni los modelos CJK
+OCR_POOL = MODELS.register("ocr", _load_ocr)
+sample(OCR_PENDING, lambda: OCR_POOL.stats()["pending"] if MODELS.state("ocr") == READY else 0)
+
+# Caché de resultados de OCR por contenido: misma imagen (ya reducida) -> mismo resultado,
+# sin pasar por el modelo. Directorio propio para poder acotar su tamaño aparte.
+OCR_CACHE_MB = int(os.getenv("OCR_CACHE_MB", "256"))  # 0 = desactivada
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", str(7 * 24 * 3600)))
+ocr_cache = Cache(os.path.join(CACHE_DIR, 'ocr'), size_limit=OCR_CACHE_MB * 1024 * 1024) if OCR_CACHE_MB > 0 else None
+
+def _ocr_dict(r) -> dict:
+    return {
+        "rec_texts": list(r['rec_texts']),
+        "rec_scores": np.asarray(r.get('rec_scores', []), dtype=float).tolist(),
+        "rec_boxes": np.asarray(r.get('rec_boxes', [])).tolist(),
+    }
 
-ocrInstance = PaddleOCR()
+@timed("ocr_predict")
+def _ocr_result(model, img: np.ndarray) -> dict:
+    return _ocr_dict(model.predict(input=img)[0])
+
+def ocr_key(img: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(img.shape).encode())
+    h.update(np.ascontiguousarray(img).data)
+    return "ocr:" + h.hexdigest()
+
+def ocr_cache_lookup(img: np.ndarray) -> Tuple[Optional[str], Optional[dict]]:
+    if ocr_cache is None:
+        return None, None
+    key = ocr_key(img)
+    return key, ocr_cache.get(key)
+
+def ocr_cache_store(key: Optional[str], result: dict) -> None:
+    if ocr_cache is not None and key:
+        ocr_cache.set(key, result, expire=OCR_CACHE_TTL or None)
+
+@timed("ocr_predict")
+def _ocr_results(model, imgs: List[np.ndarray]) -> List[dict]:
+    # Detección + reconocimiento de todas las imágenes en una sola llamada a predict
+    return [_ocr_dict(r) for r in model.predict(input=list(imgs))]
+
+def ocr_run(img: np.ndarray) -> dict:
+    """rec_texts/rec_scores/rec_boxes de la imagen, de la caché o del pool (OCRBusy si está lleno)."""
+    key, hit = ocr_cache_lookup(img)
+    if hit is not None:
+        return hit
+    result = OCR_POOL.submit(_ocr_result, img).result()
+    ocr_cache_store(key, result)
+    return result
+
+def ocr_run_many(imgs: List[np.ndarray]) -> List[dict]:
+    """Como ocr_run para varias imágenes: las que no están en caché van juntas al modelo
+    (un solo hueco del pool)."""
+    found = [ocr_cache_lookup(img) for img in imgs]
+    out: List[Optional[dict]] = [hit for _, hit in found]
+    todo = [i for i, hit in enumerate(out) if hit is None]
+    if todo:
+        fresh = OCR_POOL.submit(_ocr_results, [imgs[i] for i in todo]).result()
+        for i, result in zip(todo, fresh):
+            ocr_cache_store(found[i][0], result)
+            out[i] = result
+    return out
 
 PRON_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 8) * 2))
+sample(PRON_QUEUE, PRON_POOL._work_queue.qsize)
+# Con spawn, cada worker de PronEngine vuelve a importar el script principal como
+# __mp_main__ (`python app.py`): esa copia no crea más workers ni lanza el warmup
+_SPAWNED_COPY = __name__ == "__mp_main__"
+# Procesos dedicados a IPA/romanización (0 = en los hilos de PRON_POOL, como antes)
+PRON_PROCS = 0 if _SPAWNED_COPY else int(os.getenv("PRON_PROCS", "0"))
+
+def _load_pron_engine() -> PronEngine:
+    engine = PronEngine(PRON_PROCS)
+    engine.warm()
+    return engine
+
+if PRON_PROCS > 0:
+    MODELS.register("pron_engine", _load_pron_engine)
+
+def _pron_engine() -> Optional[PronEngine]:
+    if PRON_PROCS <= 0:
+        return None
+    return MODELS.get("pron_engine")
+
+# WARMUP=1 carga todo en segundo plano al arrancar; también acepta una lista
+# (WARMUP=ocr,ja_tagger). /ready dice qué está cargado.
+_WARMUP = parse_warmup(os.getenv("WARMUP"))
 _inflight = {}
 _inflight_lock = threading.Lock()
 
+def _join(key: str, fn: Callable, *args) -> Future:
+    """Trabajo en curso para `key` (p.ej. "lt:..." o "pron:..."), o lo lanza en PRON_POOL."""
+    with _inflight_lock:
+        fut = _inflight.get(key)
+        leader = fut is None
+        if leader:
+            # copy_context: lo que haga el trabajo cuenta en el Server-Timing del líder
+            fut = _inflight[key] = PRON_POOL.submit(contextvars.copy_context().run, fn, *args)
+    coalesced(key.partition(":")[0], leader)
+    return fut
+
 def make_session() -> requests.Session:
     sess = requests.Session()
     retries = Retry(
@@ -69,95 +195,110 @@ def make_session() -> requests.Session:
 session = make_session()
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = 25 * 1024 * 1024 # 25 MB máximo en fotos
-cache = Cache('./.cache')
-
-_HANGUL_START, _HANGUL_END = 0xAC00, 0xD7A3
-_HAN_RANGES = [(0x4E00, 0x9FFF), (0x3400, 0x4DBF)]
+# Tope del directorio de caché y qué se descarta al llegar a él. Por defecto las entradas
+# menos pedidas (LFU): las frases frecuentes sobreviven aunque se hayan guardado hace
+# mucho. Valores de diskcache: least-frequently-used, least-recently-used,
+# least-recently-stored, none.
+CACHE_SIZE_MB = int(os.getenv("CACHE_SIZE_MB", "1024"))
+CACHE_EVICTION = os.getenv("CACHE_EVICTION", "least-frequently-used")
+# Cabecera Server-Timing con las etapas de cada petición; ?debug=1 (o X-Debug-Timing: 1)
+# las añade también al JSON en "debug". SERVER_TIMING=0 lo apaga.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") != "0"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # vacío = /admin/cache desactivado (404)
+cache = HotCache(
+    Cache(CACHE_DIR, size_limit=CACHE_SIZE_MB * 1024 * 1024, eviction_policy=CACHE_EVICTION),
+    max_items=int(os.getenv("HOT_CACHE_ITEMS", "20000")),
+    max_bytes=int(os.getenv("HOT_CACHE_MB", "64")) * 1024 * 1024,
+    ttl=float(os.getenv("HOT_CACHE_TTL", "300")),
+)
+# Coalescing entre workers que comparten CACHE_DIR (COALESCE_LEASES=0 lo desactiva).
+# LEASE_WAIT es lo que espera un follower, igual que dentro del proceso.
+LEASE_WAIT = float(os.getenv("LEASE_WAIT", "5"))
+LEASES = Leases(cache.disk, ttl=REQUEST_TIMEOUT + 5, enabled=os.getenv("COALESCE_LEASES", "1") != "0")
 
 cache_del = getattr(cache, "delete", None)
 cache_set = getattr(cache, "set", cache.add)
 
-SUPPORTED = {"en","es","fr","de","it","pt","ja","jpx","zh","zh-cn","zh-tw","ko","ru","ar","hi"}
-
-def _has_han(s: str) -> bool:
-    o = map(ord, s)
-    return any(a <= x <= b for x in o for (a, b) in _HAN_RANGES)
+# Esquema de la caché de payloads (ver cachestore.py). v2 lee también lo escrito en v1.
+CACHE_SCHEMA = os.getenv("CACHE_SCHEMA", "v2")
+STORE = make_store(
+    CACHE_SCHEMA, cache,
+    display=lambda text, lang: _display_text(text, lang),
+    pron=lambda text, lang: _get_pron(cache, cache_key(text, lang, f"pron:{lang}"), text, lang),
+)
+
+# Métricas (metrics.py): tiempo de caché como etapa, lecturas por espacio de claves y
+# líderes/seguidores de los leases entre procesos
+instrument(STORE, ("payload", "pivot_payload", "pron"), payload="cache_get", pivot_payload="cache_get", pron="cache_get",
+           put="cache_put", set_pron="cache_put", forget="cache_put")
+cache.observer = cache_event
+LEASES.observer = lambda leader: coalesced("lease", leader)
 
-def _has_hangul(s: str) -> bool:
-    return any(_HANGUL_START <= ord(c) <= _HANGUL_END for c in s)
-
-def detect_lang_safe(text: str, *, p_gap: float = 0.20) -> str:
-    t = ''.join(text.split())
-    if not t:
-        return 'en'
-    probs = detect_langs(t)
-    top = max(probs, key=lambda p: p.prob)
-    if len(probs) > 1:
-        second = sorted(probs, key=lambda p: p.prob, reverse=True)[1]
-        if (top.prob - second.prob) < p_gap:
-            return 'en'
-
-    lang = top.lang
-
-    if lang == 'ko' and not _has_hangul(t) and _has_han(t):
-        return 'zh'
-
-    return lang
+SUPPORTED = {"en","es","fr","de","it","pt","ja","jpx","zh","zh-cn","zh-tw","ko","ru","ar","hi"}
 
-def _get_pron(cache, key: str, text: str, lang: str) -> Tuple[list[str], list[str]]:
-    po: Optional[object] = cache.get(key)
+# Escritura primero y langdetect solo para texto latino, memorizado por texto (langid.py)
+@timed("detect_lang")
+def detect_lang_safe(text: str) -> str:
+    return langid.detect_lang(text)
 
-    ipa: Optional[list[str]] = None
-    roman: Optional[list[str]] = None
+@timed("pronounce")
+def _pronounce(text: str, lang: str):
+    engine = _pron_engine()
+    return engine.pronounce(text, lang) if engine is not None else pronounce(text, lang)
 
-    if isinstance(po, dict):
-        v1 = po.get('ipa'); v2 = po.get('roman') # type: ignore
-        if isinstance(v1, list) and (not v1 or isinstance(v1[0], str)) \
-           and isinstance(v2, list) and (not v2 or isinstance(v2[0], str)):
-            ipa, roman = v1, v2
+def _get_pron(cache, key: str, text: str, lang: str, pron_fn: Optional[Callable] = None) -> Tuple[list[str], list[str]]:
+    # `key` (cache_key(text, lang, "pron:lang")) queda como nombre del lease; dónde se
+    # guarda la pronunciación lo decide STORE según CACHE_SCHEMA
+    hit = STORE.pron(text, lang)
+    if hit is not None:
+        return hit
 
-    if ipa is None or roman is None:
-        pr = pronounce(text, lang)
+    lease = LEASES.acquire("pron:" + key)
+    try:
+        if lease is None:
+            # otro worker ya la está calculando
+            hit = LEASES.wait("pron:" + key, lambda: STORE.pron(text, lang), LEASE_WAIT)
+            if hit is not None:
+                return hit
+        pr = (pron_fn or _pronounce)(text, lang)
         ipa, roman = pr.ipa, pr.roman
-        cache.add(key, {'ipa': ipa, 'roman': roman})
+        STORE.set_pron(text, lang, ipa, roman)
+    finally:
+        LEASES.release("pron:" + key, lease)
 
     return ipa, roman
 
-def _upd_str(h, s: str) -> None:
-    s = " ".join(s.split())
-    b = s.encode("utf-8")
-    h.update(len(b).to_bytes(4, "big")); h.update(b)
-
-def _upd_list(h, seq: Optional[List[str]]) -> None:
-    if not seq:
-        h.update((0).to_bytes(4, "big"))
-        return
-    h.update(len(seq).to_bytes(4, "big")) 
-    for item in seq:
-        _upd_str(h, item)
-
-def _norm_text(s: str) -> str:
-    s = unicodedata.normalize("NFKC", (s or "").strip())
-    s = s.strip(_PUNCT).lower()
-    s = _WS.sub(" ", s)            # colapsa espacios repetidos
-    return s
-
-def cache_key(
-    text: str, source: str, target: str,
-    originalIpa: Optional[List[str]] = None,
-    translatedIpa: Optional[List[str]] = None,
-    originalRomanization: Optional[List[str]] = None,
-    translatedRomanization: Optional[List[str]] = None,
-) -> str:
-    s_norm = (source or "").strip().lower()
-    t_norm = (target or "").strip().lower()
-    txt    = _norm_text(text)
-
-    h = hashlib.blake2b(digest_size=16)
-    _upd_str(h, s_norm); _upd_str(h, t_norm); _upd_str(h, txt)
-    _upd_list(h, originalIpa); _upd_list(h, translatedIpa)
-    _upd_list(h, originalRomanization); _upd_list(h, translatedRomanization)
-    return "th:" + h.hexdigest()
+@timed("ltengine")
+def _lt_post(payload: dict) -> dict:
+    try:
+        r = session.post(f"{URI}/translate", json=payload, timeout=(3.0, REQUEST_TIMEOUT))
+    except Exception:
+        lt_status(None)
+        raise
+    lt_status(r.status_code)
+    if r.status_code >= 400:
+        try: err = r.json()
+        except Exception: err = r.text
+        q = payload.get("q")
+        shown = payload if not isinstance(q, list) else {**payload, "q": f"[{len(q)} textos]"}
+        raise RuntimeError(f"LTEngine {r.status_code}: {err}  | payload={shown}")
+    r.raise_for_status()
+    return r.json()
+
+def _lt_post_many(texts: List[str], src: str, tgt: str) -> List[dict]:
+    data = _lt_post({"q": texts, "source": src, "target": tgt, "format": "text"})
+    translated = data.get("translatedText")
+    if not isinstance(translated, list) or len(translated) != len(texts):
+        raise RuntimeError(f"LTEngine batch: respuesta inesperada ({type(translated).__name__})")
+    return [{"translatedText": t if isinstance(t, str) else ""} for t in translated]
+
+# Micro-batching de lt_translate (desactivado con LT_BATCH_WINDOW_MS=0)
+LT_BATCH_WINDOW_MS = float(os.getenv("LT_BATCH_WINDOW_MS", "0"))
+LT_BATCH_MAX = int(os.getenv("LT_BATCH_MAX", "32"))
+LT_BATCHER: Optional[LTBatcher] = (
+    LTBatcher(_lt_post_many, LT_BATCH_WINDOW_MS / 1000.0, LT_BATCH_MAX)
+    if LT_BATCH_WINDOW_MS > 0 else None
+)
 
 def lt_translate(q: str, source: str, target: str) -> dict:
     DEBUG = False
@@ -186,6 +327,7 @@ def lt_translate(q: str, source: str, target: str) -> dict:
         else:
             leader = False 
             if DEBUG: print("[coalesce] soy FOLLOWER, esperando")
+    coalesced("engine", leader)
     if not leader:
         ev.wait(timeout=NEG_TTL)
         v1 = cache.get(k_main)
@@ -201,18 +343,20 @@ def lt_translate(q: str, source: str, target: str) -> dict:
                 ev = threading.Event(); _inflight[k_main] = ev; leader = True
                 if DEBUG: print("[coalesce] follower toma liderazgo")
 
+    lease = None
     try:
-        payload = {"q": text, "source": src, "target": tgt, "format": "text"}
-        if DEBUG: print(f"[lt_translate] POST {URI}/translate")
-        r = session.post(f"{URI}/translate", json=payload, timeout=(3.0, REQUEST_TIMEOUT))
-        if r.status_code >= 400:
-            try: err = r.json()
-            except Exception: err = r.text
-            if DEBUG: print(f"[lt_translate] LTEngine ERROR {r.status_code}: {err}")
-            cache.add("MISS:"+k_main, 1, expire=NEG_TTL)
-            raise RuntimeError(f"LTEngine {r.status_code}: {err}  | payload={payload}")
-        r.raise_for_status()
-        out_single = r.json()
+        lease = LEASES.acquire("lt:" + k_main)
+        if lease is None:
+            if DEBUG: print("[coalesce] otro proceso es LEADER, esperando")
+            v2 = _wait_peer_translation(k_main)
+            if v2 is not None:
+                return v2
+        if LT_BATCHER is not None:
+            if DEBUG: print(f"[lt_translate] encolado en micro-batch {src}->{tgt}")
+            out_single = LT_BATCHER.submit(text, src, tgt).result(timeout=REQUEST_TIMEOUT + 5)
+        else:
+            if DEBUG: print(f"[lt_translate] POST {URI}/translate")
+            out_single = _lt_post({"q": text, "source": src, "target": tgt, "format": "text"})
         cache.add(k_main, out_single)
         if DEBUG:
             tt = (out_single.get('translatedText') or '')[:80]
@@ -224,30 +368,111 @@ def lt_translate(q: str, source: str, target: str) -> dict:
         except Exception: pass
         raise
     finally:
+        LEASES.release("lt:" + k_main, lease)
         with _inflight_lock:
             ev = _inflight.pop(k_main, None)
             if ev: ev.set()
 
-def build_payload(originalText=None, translatedText=None,
-                  detectedLanguage=None, target=None,
-                  originalIpa=None, translatedIpa = None, originalRomanization=None, translatedRomanization=None, error=None) -> dict:
-    payload = {
-        "originalText": originalText,
-        "translatedText": translatedText,
-        "detectedLanguage": detectedLanguage,
-        "target": target,
-        "originalRomanization": originalRomanization,
-        "translatedRomanization": translatedRomanization,
-        "originalIpa": originalIpa,
-        "translatedIpa": translatedIpa
-    }
-    if error is not None:
-        payload["error"] = f"Error generando frase: {str(error)}"
-    return payload
+def _wait_peer_translation(k_main: str) -> Optional[dict]:
+    """Otro worker tiene el lease de esta traducción: espera su resultado en la caché."""
+    def _ready() -> Optional[dict]:
+        v = cache.get(k_main)
+        if isinstance(v, dict) and v.get("translatedText"):
+            return v
+        if cache.get("MISS:" + k_main):
+            raise RuntimeError("negative-cache: recent failure")
+        return None
+    return LEASES.wait("lt:" + k_main, _ready, LEASE_WAIT)
+
+def lt_translate_many(texts: List[str], source: str, target: str) -> List[object]:
+    """Traduce varios textos del mismo par con un solo POST (LTEngine acepta `q` como lista).
+
+    Devuelve una lista alineada con `texts`: el dict de LTEngine o la excepción de ese ítem.
+    Respeta la caché, el caché negativo y el coalescing de `lt_translate`.
+    """
+    NEG_TTL = 5
+
+    src = (source or "").strip().lower()
+    tgt = (target or "").strip().lower()
+
+    out: List[object] = [None] * len(texts)
+    lead: dict = {}  # k_main -> índices que resolvemos nosotros
+    follow: List[int] = []
+
+    for i, q in enumerate(texts):
+        text = (q or "").strip()
+        k_main = cache_key(text, src, tgt)
+        v0 = cache.get(k_main)
+        if isinstance(v0, dict) and v0.get("translatedText"):
+            out[i] = v0
+            continue
+        if cache.get("MISS:" + k_main):
+            out[i] = RuntimeError("negative-cache: recent failure")
+            continue
+        if k_main in lead:
+            lead[k_main].append(i)
+            continue
+        with _inflight_lock:
+            if k_main in _inflight:
+                follow.append(i)
+                continue
+            _inflight[k_main] = threading.Event()
+        coalesced("engine", True)
+        lead[k_main] = [i]
+
+    # Lo que otro worker ya está traduciendo pasa a lt_translate, que espera su resultado
+    leases = {}
+    for k_main in list(lead):
+        lease = LEASES.acquire("lt:" + k_main)
+        if lease is None:
+            follow.extend(lead.pop(k_main))
+            with _inflight_lock:
+                ev = _inflight.pop(k_main, None)
+                if ev: ev.set()
+        else:
+            leases[k_main] = lease
+
+    if lead:
+        batch = [(texts[idx[0]] or "").strip() for idx in lead.values()]
+        try:
+            for (k_main, idx), res in zip(lead.items(), _lt_post_many(batch, src, tgt)):
+                cache.add(k_main, res)
+                for i in idx:
+                    out[i] = res
+        except Exception as e:
+            for k_main, idx in lead.items():
+                try: cache.add("MISS:" + k_main, 1, expire=NEG_TTL)
+                except Exception: pass
+                for i in idx:
+                    out[i] = e
+        finally:
+            for k_main, lease in leases.items():
+                LEASES.release("lt:" + k_main, lease)
+            with _inflight_lock:
+                for k_main in lead:
+                    ev = _inflight.pop(k_main, None)
+                    if ev: ev.set()
+
+    # Ítems que otro hilo ya estaba traduciendo: esperamos su resultado como follower
+    for i in follow:
+        try:
+            out[i] = lt_translate(texts[i], src, tgt)
+        except Exception as e:
+            out[i] = e
+
+    return out
 
 def retornar(payload: dict, status_code: int = 200) -> Response:
+    if g.get("debug"):
+        # copia: el payload puede ser el mismo dict que guarda la capa en memoria
+        payload = {**payload, "debug": {"timings": timings(time.perf_counter() - g.t0)}}
     return Response(orjson.dumps(payload), status=status_code, mimetype="application/json")
 
+def ocr_busy() -> Response:
+    resp = retornar(build_payload(error="ocr_busy"), 503)
+    resp.headers["Retry-After"] = str(OCR_RETRY_AFTER)
+    return resp
+
 @app.route("/", methods=["POST"])
 @cross_origin(origins="*", methods=["POST"])
 def index() -> Response:
@@ -263,66 +488,22 @@ def index() -> Response:
     else:
         sentence = conseguirPalabraRandom(tipo)
 
-    key = cache_key(sentence, originalLanguage, target)
-    _cached = cache.get(key)
-    if isinstance(_cached, dict) and all(k in _cached for k in (
-    "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-    )):
+    # `/` traduce las dos frases desde la frase en inglés: se buscan a partir de ella
+    _cached = STORE.pivot_payload(sentence, EN, originalLanguage, target)
+    if _cached is not None:
         return retornar(_cached, 200)
-    
-    display_src = sentence
-    if originalLanguage in ('ja', 'jpx'):
-        display_src = space_japanese_for_flutter(display_src)
-    elif originalLanguage.startswith('zh'):
-        display_src = space_chinese_for_flutter(display_src)
-
-    rev_key = "rev:" + cache_key(display_src, originalLanguage, target)
-    _rev = cache.get(rev_key)
-
-    if isinstance(_rev, dict):
-        ptr = _rev.get("payload_key")
-        back = cache.get(ptr) if isinstance(ptr, str) else None
-        translated_text = _rev.get("orig_text") or ""
-
-        if isinstance(back, dict) and all(k in back for k in (
-            "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-        )):
-            payload = build_payload(
-                display_src, translated_text, originalLanguage, target,
-                back["translatedIpa"], back["originalIpa"],
-                back["translatedRomanization"], back["originalRomanization"]
-            )
-        else:
-            display_tgt = translated_text
-            if target in ('ja','jpx'):
-                display_tgt = space_japanese_for_flutter(display_tgt)
-            elif target.startswith('zh'):
-                display_tgt = space_chinese_for_flutter(display_tgt)
-            k_o = cache_key(display_src,      originalLanguage, f"pron:{originalLanguage}")
-            k_t = cache_key(display_tgt,  target,           f"pron:{target}")
-            oIpa, oRom = _get_pron(cache, k_o, display_src,     originalLanguage)
-            tIpa, tRom = _get_pron(cache, k_t, display_tgt, target)
-            payload = build_payload(display_src, translated_text, originalLanguage, target,
-                                    oIpa, tIpa, oRom, tRom)
-
-        cache_set(key, payload)
-        return retornar(payload, 200)
 
     try:
         if (originalLanguage == EN or originalLanguage == "auto") and target == EN: # Inglés a inglés
             k = cache_key(sentence, EN, f"pron:{EN}")
             ipa, roman = _get_pron(cache, k, sentence, EN)
             payload = build_payload(sentence, sentence, EN, EN, ipa, ipa, roman, roman)
-            cache_set(key, payload)
+            STORE.put(payload, key_text=sentence, pivot=(EN, sentence))
             return retornar(payload, 200)
 
         if originalLanguage == target and originalLanguage != EN:
             ltk_same = "lt:" + cache_key(sentence, EN, target)
-            with _inflight_lock:
-                fut_same = _inflight.get(ltk_same)
-                if fut_same is None:
-                    fut_same = PRON_POOL.submit(lt_translate, sentence, EN, target)
-                    _inflight[ltk_same] = fut_same
+            fut_same = _join(ltk_same, lt_translate, sentence, EN, target)
             try:
                 resp_same = fut_same.result()
             finally:
@@ -342,10 +523,7 @@ def index() -> Response:
             ipa, roman = _get_pron(cache, k, display, target)
 
             payload = build_payload(display, display, target, target, ipa, ipa, roman, roman)
-            cache_set(key, payload)
-
-            rev_key = "rev:" + cache_key(display, originalLanguage, target)
-            cache_set(rev_key, {"payload_key": key, "orig_text": display})
+            STORE.put(payload, key_text=sentence, pivot=(EN, sentence))
             return retornar(payload, 200)
 
         original_text = sentence
@@ -358,19 +536,11 @@ def index() -> Response:
         
         if originalLanguage not in (EN, "auto"):
             ltk_orig = "lt:" + cache_key(sentence, EN, originalLanguage)
-            with _inflight_lock:
-                fut_orig = _inflight.get(ltk_orig)
-                if fut_orig is None:
-                    fut_orig = PRON_POOL.submit(lt_translate, sentence, EN, originalLanguage)
-                    _inflight[ltk_orig] = fut_orig
+            fut_orig = _join(ltk_orig, lt_translate, sentence, EN, originalLanguage)
             
         if target != EN:
             ltk_tgt = "lt:" + cache_key(sentence, EN, target)
-            with _inflight_lock:
-                fut_tgt = _inflight.get(ltk_tgt)
-                if fut_tgt is None:
-                    fut_tgt = PRON_POOL.submit(lt_translate, sentence, EN, target)
-                    _inflight[ltk_tgt] = fut_tgt
+            fut_tgt = _join(ltk_tgt, lt_translate, sentence, EN, target)
 
         if fut_orig is not None:
             try:
@@ -407,15 +577,8 @@ def index() -> Response:
         k_t = cache_key(display_translated, target,           f"pron:{target}")
         pko = "pron:" + k_o
         pkt = "pron:" + k_t
-        with _inflight_lock:
-            f1 = _inflight.get(pko)
-            if f1 is None:
-                f1 = PRON_POOL.submit(_get_pron, cache, k_o, display_original, originalLanguage)
-                _inflight[pko] = f1
-            f2 = _inflight.get(pkt)
-            if f2 is None:
-                f2 = PRON_POOL.submit(_get_pron, cache, k_t, display_translated, target)
-                _inflight[pkt] = f2
+        f1 = _join(pko, _get_pron, cache, k_o, display_original, originalLanguage)
+        f2 = _join(pkt, _get_pron, cache, k_t, display_translated, target)
         try:
             originalIpa, originalRomanization = f1.result()
             translatedIpa, translatedRomanization = f2.result()
@@ -427,9 +590,7 @@ def index() -> Response:
         payload = build_payload(
             display_original, display_translated, originalLanguage, target, originalIpa, translatedIpa, originalRomanization, translatedRomanization
         )
-        cache_set(key, payload)
-        rev_key = "rev:" + cache_key(display_translated, target, originalLanguage)
-        cache_set(rev_key, {"payload_key": key, "orig_text": display_original})
+        STORE.put(payload, key_text=sentence, pivot=(EN, sentence))
         return retornar(payload, 200)
 
     except Exception as e:
@@ -446,37 +607,42 @@ def index() -> Response:
             502
         )
     
-@app.route("/translate", methods=["POST"])
-@cross_origin(origins="*", methods=["POST"])
-def translate() -> Response:
-    data = orjson.loads(request.data or b"{}")
-    get = data.get
-    sentence = (get("q") or "").strip()
-    source   = (get("source") or "auto").strip().lower()
-    target   = (get("target") or "es").strip().lower()
-    
+def _prepare_query(q, source, target) -> Tuple[str, str, str, Optional[dict]]:
+    """Normaliza una consulta de /translate. Si no hay nada que traducir devuelve el payload final."""
+    sentence = (q or "").strip()
+    source   = (source or "auto").strip().lower()
+    target   = (target or "es").strip().lower()
+
     sentence = sentence[:MAX_SENTENCE_LENGTH]
     if "  " in sentence or "\n" in sentence or "\t" in sentence:
         sentence = " ".join(sentence.split())
-        
+
     if sentence.isdigit():
-        return retornar(build_payload(sentence, sentence, source, target), 200)
-    
+        return sentence, source, target, build_payload(sentence, sentence, source, target)
+
     sentence = ''.join(ch for ch in sentence if not ch.isdigit())
-    
+
     if not sentence:
-        return retornar(build_payload("", "", source, target), 200)
+        return sentence, source, target, build_payload("", "", source, target)
 
     if source == "auto":
         source = detect_lang_safe(sentence)
         if source not in SUPPORTED:
             source = "en"
 
-    key = cache_key(sentence, source, target)
-    _cached = cache.get(key)
-    if isinstance(_cached, dict) and all(k in _cached for k in (
-        "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-    )):
+    return sentence, source, target, None
+
+@app.route("/translate", methods=["POST"])
+@cross_origin(origins="*", methods=["POST"])
+def translate() -> Response:
+    data = orjson.loads(request.data or b"{}")
+    get = data.get
+    sentence, source, target, early = _prepare_query(get("q"), get("source"), get("target"))
+    if early is not None:
+        return retornar(early, 200)
+
+    _cached = STORE.payload(sentence, source, target)
+    if _cached is not None:
         return retornar(_cached, 200)
 
     display_src = sentence
@@ -485,59 +651,15 @@ def translate() -> Response:
     elif source.startswith('zh'):
         display_src = space_chinese_for_flutter(display_src)
 
-    rev_key = "rev:" + cache_key(display_src, source, target)
-    _rev = cache.get(rev_key)
-    if isinstance(_rev, dict):
-        ptr = _rev.get("payload_key")
-        back = cache.get(ptr) if isinstance(ptr, str) else None
-        translated_text = _rev.get("orig_text") or ""
-        if isinstance(back, dict) and all(k in back for k in (
-            "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-        )):
-            payload = build_payload(
-                display_src, translated_text, source, target,
-                back["translatedIpa"], back["originalIpa"],
-                back["translatedRomanization"], back["originalRomanization"]
-            )
-        else:
-            k_o = cache_key(display_src,     source, f"pron:{source}")
-            k_t = cache_key(translated_text, target, f"pron:{target}")
-            pko = "pron:" + k_o
-            pkt = "pron:" + k_t
-            with _inflight_lock:
-                f1 = _inflight.get(pko)
-                if f1 is None:
-                    f1 = PRON_POOL.submit(_get_pron, cache, k_o, display_src,     source)
-                    _inflight[pko] = f1
-                f2 = _inflight.get(pkt)
-                if f2 is None:
-                    f2 = PRON_POOL.submit(_get_pron, cache, k_t, translated_text, target)
-                    _inflight[pkt] = f2
-            try:
-                (oIpa, oRom) = f1.result()
-                (tIpa, tRom) = f2.result()
-            finally:
-                with _inflight_lock:
-                    if _inflight.get(pko) is f1: del _inflight[pko]
-                    if _inflight.get(pkt) is f2: del _inflight[pkt]
-            payload = build_payload(display_src, translated_text, source, target, oIpa, tIpa, oRom, tRom)
-
-        cache_set(key, payload)
-        return retornar(payload, 200)
-
     if source == target:
         k_pron = cache_key(display_src, target, f"pron:{target}")
         ipa, roman = _get_pron(cache, k_pron, display_src, target)
         payload = build_payload(display_src, display_src, target, target, ipa, ipa, roman, roman)
-        cache_set(key, payload)
+        STORE.put(payload, key_text=sentence)
         return retornar(payload, 200)
 
-    ltk: Optional[str] = "lt:" + cache_key(sentence, source, target)
-    with _inflight_lock:
-        fut: Optional[Future] = _inflight.get(ltk)
-        if fut is None:
-            fut = PRON_POOL.submit(lt_translate, sentence, source, target)
-            _inflight[ltk] = fut
+    ltk = "lt:" + cache_key(sentence, source, target)
+    fut = _join(ltk, lt_translate, sentence, source, target)
     try:
         data_lt = fut.result()
     finally:
@@ -558,15 +680,8 @@ def translate() -> Response:
     k_t = cache_key(display_translated, target, f"pron:{target}")
     pko = "pron:" + k_o
     pkt = "pron:" + k_t
-    with _inflight_lock:
-        f1 = _inflight.get(pko)
-        if f1 is None:
-            f1 = PRON_POOL.submit(_get_pron, cache, k_o, display_original,  source)
-            _inflight[pko] = f1
-        f2 = _inflight.get(pkt)
-        if f2 is None:
-            f2 = PRON_POOL.submit(_get_pron, cache, k_t, display_translated, target)
-            _inflight[pkt] = f2
+    f1 = _join(pko, _get_pron, cache, k_o, display_original,  source)
+    f2 = _join(pkt, _get_pron, cache, k_t, display_translated, target)
     try:
         (originalIpa,  originalRomanization)    = f1.result()
         (translatedIpa, translatedRomanization) = f2.result()
@@ -579,83 +694,146 @@ def translate() -> Response:
         display_original, display_translated, source, target,
         originalIpa, translatedIpa, originalRomanization, translatedRomanization
     )
-    cache_set(key, resultado)
-
-    rev_key = "rev:" + cache_key(display_translated, target, source)
-    cache_set(rev_key, {"payload_key": key, "orig_text": display_original})
+    STORE.put(resultado, key_text=sentence)
     return retornar(resultado, 200)
 
-def _clean_ocr_by_lang(s: str, lang: str) -> str:
-    s = s or ""
-    def keep(ch: str) -> str:
-        c = ord(ch)
-        if ch.isspace(): return ' '
-        if ch.isdigit(): return ch
-        # LATIN (en, es, fr, de, it, pt)
-        if lang in {'en','es','fr','de','it','pt'}:
-            if ch.isalpha() and (('A' <= ch <= 'Z') or ('a' <= ch <= 'z') or 0x00C0 <= c <= 0x024F or 0x1E00 <= c <= 0x1EFF): return ch
-            return ' '
-        # CYRILLIC
-        if lang == 'ru':
-            return ch if (0x0400 <= c <= 0x04FF or 0x0500 <= c <= 0x052F) else ' '
-        # ARABIC
-        if lang == 'ar':
-            return ch if (0x0600 <= c <= 0x06FF or 0x0750 <= c <= 0x077F or 0x08A0 <= c <= 0x08FF) else ' '
-        # DEVANAGARI (hi)
-        if lang == 'hi':
-            return ch if (0x0900 <= c <= 0x097F) else ' '
-        # JAPANESE (ja/jpx): Hiragana, Katakana, Kanji
-        if lang in {'ja','jpx'}:
-            return ch if ((0x3040 <= c <= 0x30FF) or (0x31F0 <= c <= 0x31FF) or (0x3400 <= c <= 0x4DBF) or (0x4E00 <= c <= 0x9FFF)) else ' '
-        # CHINESE (zh, zh-cn, zh-tw): Han
-        if lang.startswith('zh'):
-            return ch if ((0x3400 <= c <= 0x4DBF) or (0x4E00 <= c <= 0x9FFF)) else ' '
-        if ch.isalpha() and 'LATIN' in unicodedata.name(ch, ''): return ch
-        return ' '
-    cleaned = ''.join(keep(ch) for ch in s)
-    return ' '.join(cleaned.split())
+def _resolve_batch(results: List[Optional[dict]], entries: List[Tuple[int, str, str, str, str]]) -> None:
+    """Rellena results[i] para cada (i, frase, origen, destino, texto de la clave v1).
+
+    Caché primero, un solo POST a LTEngine por par de idiomas y la pronunciación de
+    todo el lote en paralelo. Lo usan /translate/batch y /ocr/batch.
+    """
+    misses: dict = {}  # (source, target) -> [(idx, sentence, key_text)]
+
+    # 1) Resolver desde caché en una sola pasada
+    for i, sentence, source, target, key_text in entries:
+        _cached = STORE.payload(sentence, source, target, key_text, follow_rev=False)
+        if _cached is not None:
+            results[i] = _cached
+            continue
+        misses.setdefault((source, target), []).append((i, sentence, key_text))
+
+    # 2) Un solo POST a LTEngine por par de idiomas (solo los que faltan)
+    lt_futs = {}
+    for (source, target), group in misses.items():
+        if source == target:
+            continue
+        lt_futs[(source, target)] = PRON_POOL.submit(
+            contextvars.copy_context().run, lt_translate_many, [sentence for _, sentence, _ in group], source, target
+        )
+
+    # 3) Pronunciación de todo el lote en paralelo
+    pending = []
+    for (source, target), group in misses.items():
+        fut = lt_futs.get((source, target))
+        translations = fut.result() if fut is not None else [None] * len(group)
+        for (i, sentence, key_text), data_lt in zip(group, translations):
+            if isinstance(data_lt, Exception):
+                results[i] = build_payload(sentence, None, source, target, error=data_lt)
+                continue
+
+            display_original = _display_text(sentence, source)
+            if data_lt is None:
+                display_translated = display_original
+            else:
+                display_translated = _display_text(data_lt.get("translatedText") or "", target)
+
+            k_o = cache_key(display_original,  source, f"pron:{source}")
+            k_t = cache_key(display_translated, target, f"pron:{target}")
+            pko, pkt = "pron:" + k_o, "pron:" + k_t
+            f1 = _join(pko, _get_pron, cache, k_o, display_original,  source)
+            f2 = _join(pkt, _get_pron, cache, k_t, display_translated, target)
+            pending.append((i, key_text, source, target, display_original, display_translated, pko, pkt, f1, f2))
+
+    for (i, key_text, source, target, display_original, display_translated, pko, pkt, f1, f2) in pending:
+        try:
+            (originalIpa,  originalRomanization)    = f1.result()
+            (translatedIpa, translatedRomanization) = f2.result()
+        except Exception as e:
+            results[i] = build_payload(display_original, display_translated, source, target, error=e)
+            continue
+        finally:
+            with _inflight_lock:
+                if _inflight.get(pko) is f1: del _inflight[pko]
+                if _inflight.get(pkt) is f2: del _inflight[pkt]
+
+        resultado = build_payload(
+            display_original, display_translated, source, target,
+            originalIpa, translatedIpa, originalRomanization, translatedRomanization
+        )
+        STORE.put(resultado, key_text=key_text)
+        results[i] = resultado
+
+@app.route("/translate/batch", methods=["POST"])
+@cross_origin(origins="*", methods=["POST"])
+def translate_batch() -> Response:
+    data = orjson.loads(request.data or b"{}")
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return retornar(build_payload(error="No data"), 422)
+    if len(items) > MAX_BATCH_ITEMS:
+        return retornar(build_payload(error=f"Máximo {MAX_BATCH_ITEMS} ítems por lote"), 413)
+
+    results: List[Optional[dict]] = [None] * len(items)
+    entries = []
+    for i, it in enumerate(items):
+        it = it if isinstance(it, dict) else {}
+        sentence, source, target, early = _prepare_query(it.get("q"), it.get("source"), it.get("target"))
+        if early is not None:
+            results[i] = early
+            continue
+        entries.append((i, sentence, source, target, sentence))
+
+    _resolve_batch(results, entries)
+    return retornar({"results": results}, 200)
+
+def _display_text(text: str, lang: str) -> str:
+    if lang in ('ja', 'jpx'):
+        return space_japanese_for_flutter(text)
+    if lang.startswith('zh'):
+        return space_chinese_for_flutter(text)
+    return text
+
+def _ocr_sentence(res: dict, originalLanguage: str) -> Tuple[str, str, str]:
+    """Une los segmentos del OCR: (texto para la clave, idioma, texto limpio a traducir).
+    Las cajas dudosas se descartan y el resto va en orden de lectura (ocrtext.py)."""
+    texts = reading_order(res, rtl=originalLanguage == "ar")
+    ocrString = strip_digits(" ".join(" ".join(texts).split()))
+    if not ocrString.strip():
+        return "", originalLanguage, ""
+
+    lang = detect_lang_safe(ocrString) if originalLanguage == 'auto' else originalLanguage
+    if lang not in SUPPORTED:
+        lang = "en"
+
+    return ocrString, lang, clean_by_lang(ocrString, lang)
 
 @app.route("/ocr", methods=["POST"])
 @cross_origin(origins="*", methods=["POST"])
 def ocr() -> Response:
-    data = orjson.loads(request.data or b"{}")
+    try:
+        img, data = read_image_from_request()
+    except Exception as e:
+        return retornar(build_payload(error=f"Bad image: {e}"), 422)
     get = data.get
     originalLanguage =(get("originalLanguage") or "auto").strip().lower()
     target = (get("target") or "en").strip().lower()
-
-    img = read_image_from_request()
     if img is None:
         return retornar(build_payload(error="No image"), 422)
 
     try:
-        result = ocrInstance.predict(input=img)
-        texts = result[0]['rec_texts']
+        res = ocr_run(img)
+    except OCRBusy:
+        return ocr_busy()
     except Exception as e:
         return retornar(build_payload(error=f"OCR Error: {e}"), 500)
 
-    ocrString = " ".join(t for t in texts if t).strip()
-    if not ocrString:
-        return retornar(build_payload("", "", originalLanguage, target), 200)
-
-    if "  " in ocrString or "\n" in ocrString or "\t" in ocrString:
-        ocrString = " ".join(ocrString.split())
-        
-    ocrString = ''.join(ch for ch in ocrString if not ch.isdigit())
-
-    s = ocrString
-    lang = detect_lang_safe(s) if originalLanguage == 'auto' else originalLanguage
-    if lang not in SUPPORTED:
-        lang = "en"
-        
-    s = _clean_ocr_by_lang(s, lang)
+    ocrString, lang, s = _ocr_sentence(res, originalLanguage)
     if not s:
         return retornar(build_payload("", "", lang, target), 200)
 
-    key = cache_key(ocrString, lang, target)
-    _cached = cache.get(key)
-    if isinstance(_cached, dict) and all(k in _cached for k in (
-        "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-    )):
+    _cached = STORE.payload(s, lang, target, key_text=ocrString, follow_rev=False)
+    if _cached is not None:
         return retornar(_cached, 200)
 
     if lang == target:
@@ -667,11 +845,7 @@ def ocr() -> Response:
 
         k_pron = cache_key(display, lang, f"pron:{lang}")
         pkey = "pron:" + k_pron
-        with _inflight_lock:
-            f = _inflight.get(pkey)
-            if f is None:
-                f = PRON_POOL.submit(_get_pron, cache, k_pron, display, lang)
-                _inflight[pkey] = f
+        f = _join(pkey, _get_pron, cache, k_pron, display, lang)
         try:
             ipa, rom = f.result()
         finally:
@@ -680,15 +854,11 @@ def ocr() -> Response:
                     del _inflight[pkey]
 
         payload = build_payload(display, display, lang, target, ipa, ipa, rom, rom)
-        cache_set(key, payload)
+        STORE.put(payload, key_text=ocrString)
         return retornar(payload, 200)
 
     ltk = "lt:" + cache_key(ocrString, lang, target)
-    with _inflight_lock:
-        fut = _inflight.get(ltk)
-        if fut is None:
-            fut = PRON_POOL.submit(lt_translate, s, lang, target)
-            _inflight[ltk] = fut
+    fut = _join(ltk, lt_translate, s, lang, target)
     try:
         data_lt = fut.result()
     finally:
@@ -714,15 +884,8 @@ def ocr() -> Response:
     k_t = cache_key(display_translated, target, f"pron:{target}")
     pko = "pron:" + k_o
     pkt = "pron:" + k_t
-    with _inflight_lock:
-        f1 = _inflight.get(pko)
-        if f1 is None:
-            f1 = PRON_POOL.submit(_get_pron, cache, k_o, display_original,  lang)
-            _inflight[pko] = f1
-        f2 = _inflight.get(pkt)
-        if f2 is None:
-            f2 = PRON_POOL.submit(_get_pron, cache, k_t, display_translated, target)
-            _inflight[pkt] = f2
+    f1 = _join(pko, _get_pron, cache, k_o, display_original,  lang)
+    f2 = _join(pkt, _get_pron, cache, k_t, display_translated, target)
     try:
         (originalIpa,  originalRomanization)    = f1.result()
         (translatedIpa, translatedRomanization) = f2.result()
@@ -735,27 +898,125 @@ def ocr() -> Response:
         display_original, display_translated, lang, target,
         originalIpa, translatedIpa, originalRomanization, translatedRomanization
     )
-    cache_set(key, resultado)
+    STORE.put(resultado, key_text=ocrString)
     return retornar(resultado, 200)
 
-def read_image_from_request():
+@app.route("/ocr/batch", methods=["POST"])
+@cross_origin(origins="*", methods=["POST"])
+def ocr_batch() -> Response:
+    try:
+        decoded, data = read_images_from_request()
+    except Exception as e:
+        return retornar(build_payload(error=f"Bad request: {e}"), 422)
+    if not decoded:
+        return retornar(build_payload(error="No image"), 422)
+    if len(decoded) > OCR_BATCH_MAX:
+        return retornar(build_payload(error=f"Máximo {OCR_BATCH_MAX} imágenes por lote"), 413)
+    get = data.get
+    originalLanguage = (get("originalLanguage") or "auto").strip().lower()
+    target = (get("target") or "en").strip().lower()
+
+    results: List[Optional[dict]] = [None] * len(decoded)
+    ok = [i for i, img in enumerate(decoded) if isinstance(img, np.ndarray)]
+    for i, img in enumerate(decoded):
+        if not isinstance(img, np.ndarray):
+            results[i] = build_payload(error=f"Bad image: {img}")
+
+    try:
+        ocr_out = ocr_run_many([decoded[i] for i in ok])
+    except OCRBusy:
+        return ocr_busy()
+    except Exception as e:
+        return retornar(build_payload(error=f"OCR Error: {e}"), 500)
+
+    # Los segmentos de todas las imágenes se traducen juntos (un POST por par de idiomas)
+    entries = []
+    for i, res in zip(ok, ocr_out):
+        ocrString, lang, s = _ocr_sentence(res, originalLanguage)
+        if not s:
+            results[i] = build_payload("", "", lang, target)
+            continue
+        entries.append((i, s, lang, target, ocrString))
+
+    _resolve_batch(results, entries)
+    return retornar({"results": results}, 200)
+
+def read_images_from_request() -> Tuple[List[object], dict]:
+    """Varias imágenes: multipart con varios 'file' o JSON con 'images_b64' (lista).
+    Cada elemento es el array o la excepción al decodificar esa imagen."""
+    def _decode(fp) -> object:
+        try:
+            return decode_image(fp)
+        except Exception as e:
+            return e
+    files = request.files.getlist('file')
+    if files:
+        return [_decode(f.stream) for f in files], {**request.args.to_dict(), **request.form.to_dict()}
+    data = orjson.loads(request.get_data(cache=False) or b"{}")
+    images = data.pop('images_b64', None) or []
+    if not isinstance(images, list):
+        raise ValueError("'images_b64' debe ser una lista")
+    out = []
+    for b64 in images:
+        if not isinstance(b64, str) or not b64:
+            out.append(ValueError("imagen vacía"))
+            continue
+        if b64.startswith('data:'):
+            b64 = b64[b64.find(',') + 1:]
+        try:
+            out.append(_decode(io.BytesIO(base64.b64decode(b64))))
+        except Exception as e:
+            out.append(e)
+    return out, data
+
+def read_image_from_request() -> Tuple[Optional[np.ndarray], dict]:
+    """Devuelve (imagen, parámetros). Acepta multipart ('file'), JSON con 'image_b64' o el
+    cuerpo crudo con Content-Type image/* (parámetros en la query string)."""
+    if request.mimetype.startswith("image/"):
+        raw = request.get_data(cache=False)
+        return (decode_image(io.BytesIO(raw)) if raw else None), request.args.to_dict()
     f = request.files.get('file')
     if f:
-        img = Image.open(f.stream)
-    else:
-        data = request.get_json(silent=True) or {}
-        b64 = data.get('image_b64')
-        if not b64: raise ValueError("No hay 'file' ni 'image_b64'")
-        if b64.strip().startswith('data:') and ',' in b64:
-            b64 = b64.split(',', 1)[1]
-        img = Image.open(io.BytesIO(base64.b64decode(b64)))
-    img = ImageOps.exif_transpose(img)
+        return decode_image(f.stream), {**request.args.to_dict(), **request.form.to_dict()}
+    data = orjson.loads(request.get_data(cache=False) or b"{}")
+    b64 = data.pop('image_b64', None)
+    if not b64:
+        return None, data
+    if b64.startswith('data:'):
+        b64 = b64[b64.find(',') + 1:]
+    return decode_image(io.BytesIO(base64.b64decode(b64))), data
+
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT, 3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM, 5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270, 7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+@timed("decode_image")
+def decode_image(fp) -> np.ndarray:
+    img = Image.open(fp)
+    if img.format == "JPEG":
+        # El decodificador JPEG escala 1/2, 1/4 o 1/8 al decodificar: pedimos el menor
+        # tamaño que aún cubra MAX_LONG_SIDE y nunca se arma la foto completa en memoria
+        w, h = img.size
+        m = max(w, h)
+        if m > MAX_LONG_SIDE:
+            s = MAX_LONG_SIDE / float(m)
+            img.draft("RGB", (int(w * s + 0.5), int(h * s + 0.5)))
+    return image_to_array(img)
+
+def image_to_array(img: Image.Image) -> np.ndarray:
+    # La orientación EXIF se aplica después de reducir: girar la imagen chica es más barato
+    orientation = img.getexif().get(0x0112)
     if img.mode != "RGB": img = img.convert("RGB")
     w, h = img.size
     m = max(w, h)
     if m > MAX_LONG_SIDE:
         s = MAX_LONG_SIDE / float(m)
         img = img.resize((int(w*s), int(h*s)), Image.Resampling.LANCZOS)
+    if orientation in _EXIF_TRANSPOSE:
+        img = img.transpose(_EXIF_TRANSPOSE[orientation])
     arr = np.asarray(img, dtype=np.uint8)
     if arr.ndim == 2: arr = np.stack([arr, arr, arr], axis=-1)
     if arr.ndim == 3 and arr.shape[2] == 4: arr = arr[..., :3]
@@ -776,34 +1037,11 @@ def retranslate() -> Response:
 
     sentence = " ".join(sentence.split())[:MAX_SENTENCE_LENGTH]
 
-    key_payload = cache_key(sentence, sourceLang, targetLang)
-    
-
-    prev = cache.get(key_payload)
-    if cache_del:
-        cache_del(key_payload)
-
-    if isinstance(prev, dict):
-        prev_trans = (
-            prev.get("translatedText") or prev.get("translated_text")
-            or prev.get("translated") or prev.get("display_translated") or ""
-        )
-        if prev_trans:
-            if targetLang in ("ja","jpx"):
-                prev_trans = space_japanese_for_flutter(prev_trans)
-            elif targetLang.startswith("zh"):
-                prev_trans = space_chinese_for_flutter(prev_trans)
-            old_rev_key = "rev:" + cache_key(prev_trans, targetLang, sourceLang)
-            if cache_del:
-                cache_del(old_rev_key)
+    STORE.forget(sentence, sourceLang, targetLang)
 
     probe = sentence + "…"
     ltk = "relt:" + cache_key(probe, sourceLang, targetLang)
-    with _inflight_lock:
-        fut = _inflight.get(ltk)
-        if fut is None:
-            fut = PRON_POOL.submit(lt_translate, probe, sourceLang, targetLang)
-            _inflight[ltk] = fut
+    fut = _join(ltk, lt_translate, probe, sourceLang, targetLang)
     try:
         data_lt = fut.result()
     except Exception:
@@ -846,11 +1084,8 @@ def retranslate() -> Response:
     k_o = cache_key(display_original,  sourceLang, f"pron:{sourceLang}")
     k_t = cache_key(display_translated, targetLang, f"pron:{targetLang}")
     pko, pkt = "pron:" + k_o, "pron:" + k_t
-    with _inflight_lock:
-        f1 = _inflight.get(pko) or PRON_POOL.submit(_get_pron, cache, k_o, display_original,  sourceLang)
-        _inflight[pko] = f1
-        f2 = _inflight.get(pkt) or PRON_POOL.submit(_get_pron, cache, k_t, display_translated, targetLang)
-        _inflight[pkt] = f2
+    f1 = _join(pko, _get_pron, cache, k_o, display_original,  sourceLang)
+    f2 = _join(pkt, _get_pron, cache, k_t, display_translated, targetLang)
     try:
         (originalIpa,  originalRomanization)    = f1.result()
         (translatedIpa, translatedRomanization) = f2.result()
@@ -864,11 +1099,84 @@ def retranslate() -> Response:
         originalIpa, translatedIpa, originalRomanization, translatedRomanization
     )
 
-    cache_set(key_payload, resultado)
-    rev_key = "rev:" + cache_key(display_translated, targetLang, sourceLang)
-    cache_set(rev_key, {"payload_key": key_payload, "orig_text": display_original})
+    STORE.put(resultado, key_text=sentence)
 
     return retornar(resultado, 200)
-        
+
+def admin_authorized(headers) -> bool:
+    if not ADMIN_TOKEN:
+        return False
+    auth = headers.get("Authorization") or ""
+    given = auth[7:] if auth.startswith("Bearer ") else headers.get("X-Admin-Token") or ""
+    return hmac.compare_digest(given.encode(), ADMIN_TOKEN.encode())
+
+def cache_report(sizes: bool = False) -> dict:
+    """Estado de la caché para /admin/cache; sizes=True recorre la tabla para medir cada
+    espacio de claves (caro con cachés grandes)."""
+    disk = cache.disk
+    report = {
+        "schema": CACHE_SCHEMA,
+        "disk": {
+            "directory": disk.directory,
+            "volume": disk.volume(),
+            "size_limit": disk.size_limit,
+            "eviction_policy": disk.eviction_policy,
+        },
+        "hot": cache.hot_stats(),
+        "namespaces": cache.namespace_stats(),
+        "detect_lang": langid.cache_info(),
+    }
+    if sizes:
+        for ns, usage in disk_usage(disk).items():
+            report["namespaces"].setdefault(ns, {}).update(usage)
+    if ocr_cache is not None:
+        report["ocr"] = {"volume": ocr_cache.volume(), "size_limit": ocr_cache.size_limit,
+                         "items": len(ocr_cache)}
+    return report
+
+@app.route("/admin/cache", methods=["GET"])
+def admin_cache() -> Response:
+    if not ADMIN_TOKEN:
+        return retornar({"error": "not found"}, 404)
+    if not admin_authorized(request.headers):
+        return retornar({"error": "unauthorized"}, 401)
+    return retornar(cache_report(request.args.get("sizes") == "1"), 200)
+
+def wants_debug(args, headers) -> bool:
+    return SERVER_TIMING and (args.get("debug") == "1" or headers.get("X-Debug-Timing") == "1")
+
+@app.before_request
+def _start_timer() -> None:
+    g.t0 = time.perf_counter()
+    g.debug = wants_debug(request.args, request.headers)
+    if SERVER_TIMING:
+        start_timings()
+
+@app.after_request
+def _observe(resp: Response) -> Response:
+    t0 = g.get("t0")
+    if t0 is not None:
+        elapsed = time.perf_counter() - t0
+        rule = request.url_rule.rule if request.url_rule is not None else "other"
+        observe_request(rule, request.method, resp.status_code, elapsed)
+        if SERVER_TIMING:
+            resp.headers["Server-Timing"] = server_timing(timings(elapsed))
+            resp.headers["Timing-Allow-Origin"] = "*"
+    return resp
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    body, ctype = render()
+    return Response(body, status=200, content_type=ctype)
+
+@app.route("/ready", methods=["GET"])
+def ready() -> Response:
+    # 200 cuando terminó el warmup pedido en WARMUP (o si no se pidió ninguno)
+    ok = MODELS.ready()
+    return retornar({"ready": ok, "models": MODELS.status()}, 200 if ok else 503)
+
+if _WARMUP != [] and not _SPAWNED_COPY:
+    MODELS.warm_async(_WARMUP)
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", debug=True, use_reloader=False, port=3000, threaded=True)
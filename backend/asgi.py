@@ -0,0 +1,634 @@
+# asgi.py
+# Modo de servicio asíncrono (ASGI) con los mismos endpoints que app.py.
+# Las llamadas a LTEngine usan httpx sin bloquear y el trabajo de CPU (IPA, romanización,
+# espaciado CJK, OCR) se manda a PRON_POOL, así que miles de peticiones esperando a
+# LTEngine no ocupan un hilo del SO cada una.
+# Uso:
+#   hypercorn asgi:app --bind 0.0.0.0:3000
+from quart import Quart, g, request
+from quart.wrappers import Response
+from quart_cors import route_cors
+from typing import List, Optional, Tuple
+from registry import MODELS
+from ocrpool import OCRBusy
+from metrics import (
+    STAGE_SECONDS, lt_status, coalesced, observe_request, render, note, start_timings, timings,
+    server_timing,
+)
+from app import (
+    cache, cache_key, build_payload, _get_pron, STORE,
+    _prepare_query, _display_text, _ocr_sentence, decode_image, _ocr_result, _ocr_results,
+    ocr_cache_lookup, ocr_cache_store,
+    generate_sentence_beginner, conseguirPalabraRandom,
+    PRON_POOL, LT_BATCHER, URI, REQUEST_TIMEOUT, MAX_SENTENCE_LENGTH, MAX_BATCH_ITEMS, EN,
+    OCR_RETRY_AFTER, OCR_BATCH_MAX, LEASES, LEASE_WAIT, ADMIN_TOKEN, admin_authorized, cache_report,
+    SERVER_TIMING, wants_debug,
+)
+import asyncio, base64, contextvars, io, time, httpx, orjson
+
+NEG_TTL = 5
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+app = Quart(__name__)
+app.config["MAX_CONTENT_LENGTH"] = 25 * 1024 * 1024 # 25 MB máximo en fotos
+
+_client: Optional[httpx.AsyncClient] = None
+_ainflight: dict = {}  # key -> asyncio.Future (todo corre en el mismo loop, no hace falta lock)
+
+@app.before_serving
+async def _startup() -> None:
+    global _client
+    _client = httpx.AsyncClient(
+        base_url=URI,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=3.0),
+        limits=httpx.Limits(max_connections=1024, max_keepalive_connections=256),
+        headers={"Accept": "application/json", "User-Agent": "waza-asgi/1.0"},
+    )
+
+@app.after_serving
+async def _shutdown() -> None:
+    if _client is not None:
+        await _client.aclose()
+
+def retornar(payload: dict, status_code: int = 200) -> Response:
+    if g.get("debug"):
+        payload = {**payload, "debug": {"timings": timings(time.perf_counter() - g.t0)}}
+    return Response(orjson.dumps(payload), status=status_code, mimetype="application/json")
+
+async def _run(fn, *args):
+    # run_in_executor no pasa el contexto: sin esto las etapas no llegan al Server-Timing
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(PRON_POOL, ctx.run, fn, *args)
+
+async def _single_flight(key: str, factory):
+    """Coalescing dentro del loop: el primero crea la tarea, el resto espera la misma."""
+    fut = _ainflight.get(key)
+    leader = fut is None
+    if leader:
+        fut = asyncio.ensure_future(factory())
+        _ainflight[key] = fut
+        fut.add_done_callback(lambda f: _forget(key, f))
+    coalesced("pron" if key.startswith("pron:") else "engine", leader)
+    return await asyncio.shield(fut)
+
+def _forget(key: str, fut: asyncio.Future) -> None:
+    if _ainflight.get(key) is fut:
+        del _ainflight[key]
+    if not fut.cancelled():
+        fut.exception()  # marca la excepción como recuperada aunque no haya followers
+
+async def _lt_post(payload: dict) -> dict:
+    # Mismo criterio que el Retry de make_session(): un reintento con backoff para 429/5xx
+    for attempt in range(2):
+        t0 = time.perf_counter()
+        try:
+            r = await _client.post("/translate", json=payload)
+        except httpx.TransportError:
+            lt_status(None)
+            if attempt: raise
+            await asyncio.sleep(0.5)
+            continue
+        finally:
+            dt = time.perf_counter() - t0
+            STAGE_SECONDS.labels("ltengine").observe(dt)
+            note("ltengine", dt)
+        lt_status(r.status_code)
+        if r.status_code in _RETRY_STATUS and not attempt:
+            await asyncio.sleep(0.5)
+            continue
+        if r.status_code >= 400:
+            try: err = r.json()
+            except Exception: err = r.text
+            raise RuntimeError(f"LTEngine {r.status_code}: {err}  | payload={payload}")
+        return r.json()
+    raise RuntimeError("LTEngine: sin respuesta")
+
+async def lt_translate(q: str, source: str, target: str) -> dict:
+    src = (source or "").strip().lower()
+    tgt = (target or "").strip().lower()
+    text = (q or "").strip()
+    k_main = cache_key(text, src, tgt); k_neg = "MISS:"+k_main
+
+    v0, neg = await _run(_lookup, k_main)
+    if isinstance(v0, dict) and v0.get("translatedText"):
+        return v0
+    if neg:
+        raise RuntimeError("negative-cache: recent failure")
+
+    async def _leader() -> dict:
+        lease = await _run(LEASES.acquire, "lt:" + k_main)
+        try:
+            if lease is None:
+                v2 = await _wait_peer(k_main)
+                if v2 is not None:
+                    return v2
+            if LT_BATCHER is not None:
+                out = await asyncio.wrap_future(LT_BATCHER.submit(text, src, tgt))
+            else:
+                out = await _lt_post({"q": text, "source": src, "target": tgt, "format": "text"})
+            await _run(cache.add, k_main, out)
+            return out
+        except Exception:
+            await _run(_remember_failure, [k_main])
+            raise
+        finally:
+            _release({k_main: lease})
+
+    return await _single_flight(k_main, _leader)
+
+def _lookup(k_main: str) -> Tuple[object, object]:
+    """(traducción en caché, marca de fallo reciente) de una clave; en el executor."""
+    return cache.get(k_main), cache.get("MISS:" + k_main)
+
+def _remember_failure(keys: List[str]) -> None:
+    for k_main in keys:
+        try: cache.add("MISS:" + k_main, 1, expire=NEG_TTL)
+        except Exception: pass
+
+def _release(leases: dict) -> None:
+    # Sin await: también se libera si la petición se cancela mientras tanto
+    PRON_POOL.submit(lambda: [LEASES.release("lt:" + k, lease) for k, lease in leases.items()])
+
+def _peer_state(k_main: str) -> Tuple[object, object, bool]:
+    v, neg = _lookup(k_main)
+    return v, neg, LEASES.held("lt:" + k_main)
+
+async def _wait_peer(k_main: str) -> Optional[dict]:
+    """Como app._wait_peer_translation, sondeando sin bloquear el loop."""
+    for delay in LEASES.delays(LEASE_WAIT):
+        v, neg, held = await _run(_peer_state, k_main)
+        if isinstance(v, dict) and v.get("translatedText"):
+            return v
+        if neg:
+            raise RuntimeError("negative-cache: recent failure")
+        if not held:
+            break
+        await asyncio.sleep(delay)
+    v, _ = await _run(_lookup, k_main)
+    return v if isinstance(v, dict) and v.get("translatedText") else None
+
+async def lt_translate_many(texts: List[str], source: str, target: str) -> List[object]:
+    """Versión async de app.lt_translate_many: un solo POST con `q` como lista."""
+    src = (source or "").strip().lower()
+    tgt = (target or "").strip().lower()
+
+    out: List[object] = [None] * len(texts)
+    lead: dict = {}
+    follow: List[int] = []
+    stripped = [(q or "").strip() for q in texts]
+    keys = [cache_key(text, src, tgt) for text in stripped]
+    found = await _run(lambda: [_lookup(k) for k in keys])
+    for i, (text, k_main, (v0, neg)) in enumerate(zip(stripped, keys, found)):
+        if isinstance(v0, dict) and v0.get("translatedText"):
+            out[i] = v0
+        elif neg:
+            out[i] = RuntimeError("negative-cache: recent failure")
+        elif k_main in lead:
+            lead[k_main][1].append(i)
+        elif k_main in _ainflight:
+            follow.append(i)
+        else:
+            lead[k_main] = (text, [i])
+
+    leases = {}
+    acquired = await _run(lambda: {k: LEASES.acquire("lt:" + k) for k in lead})
+    for k_main, lease in acquired.items():
+        if lease is None:
+            follow.extend(lead.pop(k_main)[1])  # otro worker ya la pidió
+        else:
+            leases[k_main] = lease
+
+    if lead:
+        loop = asyncio.get_running_loop()
+        futs = {}
+        for k_main in lead:
+            futs[k_main] = _ainflight[k_main] = loop.create_future()
+            futs[k_main].add_done_callback(lambda f, k=k_main: _forget(k, f))
+        try:
+            batch = [text for text, _ in lead.values()]
+            data = await _lt_post({"q": batch, "source": src, "target": tgt, "format": "text"})
+            translated = data.get("translatedText")
+            if not isinstance(translated, list) or len(translated) != len(batch):
+                raise RuntimeError(f"LTEngine batch: respuesta inesperada ({type(translated).__name__})")
+            done = {k_main: {"translatedText": t if isinstance(t, str) else ""}
+                    for k_main, t in zip(lead, translated)}
+            await _run(lambda: [cache.add(k, res) for k, res in done.items()])
+            for k_main, (_, idx) in lead.items():
+                futs[k_main].set_result(done[k_main])
+                for i in idx:
+                    out[i] = done[k_main]
+        except Exception as e:
+            await _run(_remember_failure, list(lead))
+            for k_main, (_, idx) in lead.items():
+                if not futs[k_main].done():
+                    futs[k_main].set_exception(e)
+                for i in idx:
+                    out[i] = e
+        finally:
+            # Cancelada (cliente que se va, timeout): los followers no pueden quedarse
+            # esperando un futuro que ya nadie va a resolver
+            for k_main, fut in futs.items():
+                if not fut.done():
+                    fut.set_exception(RuntimeError("LTEngine batch: petición cancelada"))
+            _release(leases)
+
+    for i in follow:
+        try:
+            out[i] = await lt_translate(texts[i], src, tgt)
+        except Exception as e:
+            out[i] = e
+    return out
+
+async def _pron(text: str, lang: str):
+    k = cache_key(text, lang, f"pron:{lang}")
+    return await _single_flight("pron:" + k, lambda: _run(_get_pron, cache, k, text, lang))
+
+async def _pron_pair(display_original: str, source: str, display_translated: str, target: str):
+    (oIpa, oRom), (tIpa, tRom) = await asyncio.gather(
+        _pron(display_original, source), _pron(display_translated, target)
+    )
+    return oIpa, tIpa, oRom, tRom
+
+async def _store(payload: dict, **kw) -> None:
+    # Con CACHE_SCHEMA=v2 un put son varias transacciones de SQLite: fuera del loop
+    await _run(lambda: STORE.put(payload, **kw))
+
+async def _from_cache(sentence: str, source: str, target: str) -> Optional[dict]:
+    """Payload desde STORE (según CACHE_SCHEMA), fuera del loop."""
+    return await _run(STORE.payload, sentence, source, target)
+
+@app.route("/", methods=["POST"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def index() -> Response:
+    data = orjson.loads(await request.get_data() or b"{}")
+    originalLanguage = (data.get("originalLanguage") or EN).strip().lower()
+    target = (data.get("target") or "es").strip().lower()
+    tipo = (data.get("tipo") or "").strip().lower()
+
+    originalLanguage = originalLanguage if originalLanguage != 'auto' else EN
+
+    if tipo == "frase":
+        sentence = generate_sentence_beginner()
+    else:
+        sentence = conseguirPalabraRandom(tipo)
+
+    hit = await _run(STORE.pivot_payload, sentence, EN, originalLanguage, target)
+    if hit is not None:
+        return retornar(hit, 200)
+    pivot = (EN, sentence)
+
+    try:
+        if originalLanguage == EN and target == EN: # Inglés a inglés
+            ipa, roman = await _pron(sentence, EN)
+            payload = build_payload(sentence, sentence, EN, EN, ipa, ipa, roman, roman)
+            await _store(payload, key_text=sentence, pivot=pivot)
+            return retornar(payload, 200)
+
+        if originalLanguage == target:
+            resp_same = await lt_translate(sentence, EN, target)
+            display = await _run(_display_text, resp_same.get("translatedText", "") or "", target)
+            ipa, roman = await _pron(display, target)
+            payload = build_payload(display, display, target, target, ipa, ipa, roman, roman)
+            await _store(payload, key_text=sentence, pivot=pivot)
+            return retornar(payload, 200)
+
+        async def _from_en(lang: str) -> str:
+            if lang == EN:
+                return sentence
+            return (await lt_translate(sentence, EN, lang)).get("translatedText", "")
+
+        original_text, translated_text = await asyncio.gather(_from_en(originalLanguage), _from_en(target))
+        display_original = await _run(_display_text, original_text or '', originalLanguage)
+        display_translated = await _run(_display_text, translated_text or '', target)
+
+        payload = build_payload(
+            display_original, display_translated, originalLanguage, target,
+            *await _pron_pair(display_original, originalLanguage, display_translated, target)
+        )
+        await _store(payload, key_text=sentence, pivot=pivot)
+        return retornar(payload, 200)
+
+    except Exception as e:
+        msg = f"{e.__class__.__name__}: {e}"
+        return retornar(
+            build_payload(sentence, None, originalLanguage, target, None, None, msg),
+            502
+        )
+
+@app.route("/translate", methods=["POST"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def translate() -> Response:
+    data = orjson.loads(await request.get_data() or b"{}")
+    get = data.get
+    sentence, source, target, early = await _run(_prepare_query, get("q"), get("source"), get("target"))
+    if early is not None:
+        return retornar(early, 200)
+
+    hit = await _from_cache(sentence, source, target)
+    if hit is not None:
+        return retornar(hit, 200)
+    display_src = await _run(_display_text, sentence, source)
+
+    if source == target:
+        ipa, roman = await _pron(display_src, target)
+        payload = build_payload(display_src, display_src, target, target, ipa, ipa, roman, roman)
+        await _store(payload, key_text=sentence)
+        return retornar(payload, 200)
+
+    data_lt = await lt_translate(sentence, source, target)
+    display_translated = await _run(_display_text, data_lt.get("translatedText") or "", target)
+
+    resultado = build_payload(
+        display_src, display_translated, source, target,
+        *await _pron_pair(display_src, source, display_translated, target)
+    )
+    await _store(resultado, key_text=sentence)
+    return retornar(resultado, 200)
+
+@app.route("/translate/batch", methods=["POST"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def translate_batch() -> Response:
+    data = orjson.loads(await request.get_data() or b"{}")
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return retornar(build_payload(error="No data"), 422)
+    if len(items) > MAX_BATCH_ITEMS:
+        return retornar(build_payload(error=f"Máximo {MAX_BATCH_ITEMS} ítems por lote"), 413)
+
+    results: List[Optional[dict]] = [None] * len(items)
+    entries = []
+    items = [it if isinstance(it, dict) else {} for it in items]
+    # Detección de idioma de todo el lote en un solo viaje al executor
+    prepared = await _run(lambda: [_prepare_query(it.get("q"), it.get("source"), it.get("target")) for it in items])
+    for i, (sentence, source, target, early) in enumerate(prepared):
+        if early is not None:
+            results[i] = early
+            continue
+        entries.append((i, sentence, source, target, sentence))
+
+    await _resolve_batch(results, entries)
+    return retornar({"results": results}, 200)
+
+async def _resolve_batch(results: List[Optional[dict]], entries: list) -> None:
+    """Versión async de app._resolve_batch: (i, frase, origen, destino, texto de la clave v1)."""
+    misses: dict = {}
+    hits = await _run(lambda: [STORE.payload(sentence, source, target, key_text, follow_rev=False)
+                               for _, sentence, source, target, key_text in entries])
+    for (i, sentence, source, target, key_text), _cached in zip(entries, hits):
+        if _cached is not None:
+            results[i] = _cached
+            continue
+        misses.setdefault((source, target), []).append((i, sentence, key_text))
+
+    async def _group(source: str, target: str, group: list) -> None:
+        if source == target:
+            translations = [None] * len(group)
+        else:
+            translations = await lt_translate_many([sentence for _, sentence, _ in group], source, target)
+
+        async def _one(i: int, sentence: str, key_text: str, data_lt) -> None:
+            if isinstance(data_lt, Exception):
+                results[i] = build_payload(sentence, None, source, target, error=data_lt)
+                return
+            display_original = await _run(_display_text, sentence, source)
+            if data_lt is None:
+                display_translated = display_original
+            else:
+                display_translated = await _run(_display_text, data_lt.get("translatedText") or "", target)
+            try:
+                pron = await _pron_pair(display_original, source, display_translated, target)
+            except Exception as e:
+                results[i] = build_payload(display_original, display_translated, source, target, error=e)
+                return
+            resultado = build_payload(display_original, display_translated, source, target, *pron)
+            await _store(resultado, key_text=key_text)
+            results[i] = resultado
+
+        await asyncio.gather(*(_one(i, s, k, d) for (i, s, k), d in zip(group, translations)))
+
+    await asyncio.gather(*(_group(src, tgt, g) for (src, tgt), g in misses.items()))
+
+def _ocr_array(raw: bytes) -> "object":
+    return decode_image(io.BytesIO(raw))
+
+def _ocr_busy() -> Response:
+    resp = retornar(build_payload(error="ocr_busy"), 503)
+    resp.headers["Retry-After"] = str(OCR_RETRY_AFTER)
+    return resp
+
+@app.route("/ocr", methods=["POST"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def ocr() -> Response:
+    if request.mimetype.startswith("image/"):
+        # cuerpo crudo: sin base64 ni multipart, parámetros en la query string
+        raw = await request.get_data(cache=False)
+        data = request.args.to_dict()
+    else:
+        files = await request.files
+        f = files.get('file')
+        if f:
+            raw = f.read()
+            data = {**request.args.to_dict(), **(await request.form).to_dict()}
+        else:
+            data = orjson.loads(await request.get_data(cache=False) or b"{}")
+            b64 = data.pop('image_b64', None)
+            if not b64:
+                return retornar(build_payload(error="No image"), 422)
+            if b64.startswith('data:'):
+                b64 = b64[b64.find(',') + 1:]
+            raw = base64.b64decode(b64)
+    if not raw:
+        return retornar(build_payload(error="No image"), 422)
+    get = data.get
+    originalLanguage = (get("originalLanguage") or "auto").strip().lower()
+    target = (get("target") or "en").strip().lower()
+
+    try:
+        arr = await _run(_ocr_array, raw)
+        ocr_key, res = await _run(ocr_cache_lookup, arr)
+        if res is None:
+            pool = await _run(MODELS.get, "ocr")  # la primera vez carga los modelos
+            try:
+                fut = pool.submit(_ocr_result, arr)
+            except OCRBusy:
+                return _ocr_busy()
+            res = await asyncio.wrap_future(fut)
+            await _run(ocr_cache_store, ocr_key, res)
+    except Exception as e:
+        return retornar(build_payload(error=f"OCR Error: {e}"), 500)
+
+    ocrString, lang, s = await _run(_ocr_sentence, res, originalLanguage)
+    if not s:
+        return retornar(build_payload("", "", lang, target), 200)
+
+    _cached = await _run(STORE.payload, s, lang, target, ocrString, False)
+    if _cached is not None:
+        return retornar(_cached, 200)
+
+    display_original = await _run(_display_text, s, lang)
+    if lang == target:
+        ipa, rom = await _pron(display_original, lang)
+        payload = build_payload(display_original, display_original, lang, target, ipa, ipa, rom, rom)
+        await _store(payload, key_text=ocrString)
+        return retornar(payload, 200)
+
+    data_lt = await lt_translate(s, lang, target)
+    display_translated = await _run(_display_text, data_lt.get("translatedText") or "", target)
+
+    resultado = build_payload(
+        display_original, display_translated, lang, target,
+        *await _pron_pair(display_original, lang, display_translated, target)
+    )
+    await _store(resultado, key_text=ocrString)
+    return retornar(resultado, 200)
+
+@app.route("/ocr/batch", methods=["POST"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def ocr_batch() -> Response:
+    files = (await request.files).getlist('file')
+    if files:
+        raws = [f.read() for f in files]
+        data = {**request.args.to_dict(), **(await request.form).to_dict()}
+    else:
+        data = orjson.loads(await request.get_data(cache=False) or b"{}")
+        images = data.pop('images_b64', None) or []
+        if not isinstance(images, list):
+            return retornar(build_payload(error="'images_b64' debe ser una lista"), 422)
+        raws = []
+        for b64 in images:
+            b64 = b64 if isinstance(b64, str) else ""
+            if b64.startswith('data:'):
+                b64 = b64[b64.find(',') + 1:]
+            try:
+                raws.append(base64.b64decode(b64))
+            except Exception:
+                raws.append(b"")
+    if not raws:
+        return retornar(build_payload(error="No image"), 422)
+    if len(raws) > OCR_BATCH_MAX:
+        return retornar(build_payload(error=f"Máximo {OCR_BATCH_MAX} imágenes por lote"), 413)
+    get = data.get
+    originalLanguage = (get("originalLanguage") or "auto").strip().lower()
+    target = (get("target") or "en").strip().lower()
+
+    async def _decode(raw: bytes):
+        try:
+            return await _run(_ocr_array, raw)
+        except Exception as e:
+            return e
+    decoded = await asyncio.gather(*(_decode(r) for r in raws))
+
+    results: List[Optional[dict]] = [None] * len(raws)
+    ocr_out: dict = {}
+    todo = []
+    for i, arr in enumerate(decoded):
+        if isinstance(arr, Exception):
+            results[i] = build_payload(error=f"Bad image: {arr}")
+            continue
+        k, res = await _run(ocr_cache_lookup, arr)
+        if res is None:
+            todo.append((i, k))
+        else:
+            ocr_out[i] = res
+    if todo:
+        try:
+            pool = await _run(MODELS.get, "ocr")
+            try:
+                fut = pool.submit(_ocr_results, [decoded[i] for i, _ in todo])
+            except OCRBusy:
+                return _ocr_busy()
+            for (i, k), res in zip(todo, await asyncio.wrap_future(fut)):
+                await _run(ocr_cache_store, k, res)
+                ocr_out[i] = res
+        except Exception as e:
+            return retornar(build_payload(error=f"OCR Error: {e}"), 500)
+
+    entries = []
+    for i, res in sorted(ocr_out.items()):
+        ocrString, lang, s = await _run(_ocr_sentence, res, originalLanguage)
+        if not s:
+            results[i] = build_payload("", "", lang, target)
+            continue
+        entries.append((i, s, lang, target, ocrString))
+
+    await _resolve_batch(results, entries)
+    return retornar({"results": results}, 200)
+
+@app.route("/retranslate", methods=["POST", "OPTIONS"])
+@route_cors(allow_origin="*", allow_methods=["POST"])
+async def retranslate() -> Response:
+    data = orjson.loads(await request.get_data() or b"{}")
+    sentence   = (data.get("sentence")   or "").strip()
+    sourceLang = (data.get("sourceLang") or "").strip().lower()
+    targetLang = (data.get("targetLang") or "").strip().lower()
+
+    if not sentence or not sourceLang or not targetLang:
+        return retornar(build_payload(error="No data"), 422)
+
+    sentence = " ".join(sentence.split())[:MAX_SENTENCE_LENGTH]
+    await _run(STORE.forget, sentence, sourceLang, targetLang)
+
+    probe = sentence + "…"
+    try:
+        data_lt = await lt_translate(probe, sourceLang, targetLang)
+    except Exception:
+        return retornar(build_payload(error="translate_failed"), 502)
+    if not isinstance(data_lt, dict):
+        return retornar(build_payload(error="bad_backend_payload"), 502)
+
+    translatedText = (
+        data_lt.get("translatedText")
+        or data_lt.get("translated_text")
+        or ""
+    ).rstrip()
+    for suf in ("…", "...", "……"):
+        if translatedText.endswith(suf):
+            translatedText = translatedText[:-len(suf)].rstrip()
+            break
+
+    display_original = await _run(_display_text, sentence, sourceLang)
+    display_translated = await _run(_display_text, translatedText, targetLang)
+
+    resultado = build_payload(
+        display_original, display_translated, sourceLang, targetLang,
+        *await _pron_pair(display_original, sourceLang, display_translated, targetLang)
+    )
+    await _store(resultado, key_text=sentence)
+    return retornar(resultado, 200)
+
+@app.route("/admin/cache", methods=["GET"])
+async def admin_cache() -> Response:
+    if not ADMIN_TOKEN:
+        return retornar({"error": "not found"}, 404)
+    if not admin_authorized(request.headers):
+        return retornar({"error": "unauthorized"}, 401)
+    return retornar(await _run(cache_report, request.args.get("sizes") == "1"), 200)
+
+@app.before_request
+async def _start_timer() -> None:
+    g.t0 = time.perf_counter()
+    g.debug = wants_debug(request.args, request.headers)
+    if SERVER_TIMING:
+        start_timings()
+
+@app.after_request
+async def _observe(resp: Response) -> Response:
+    t0 = g.get("t0")
+    if t0 is not None:
+        elapsed = time.perf_counter() - t0
+        rule = request.url_rule.rule if request.url_rule is not None else "other"
+        observe_request(rule, request.method, resp.status_code, elapsed)
+        if SERVER_TIMING:
+            resp.headers["Server-Timing"] = server_timing(timings(elapsed))
+            resp.headers["Timing-Allow-Origin"] = "*"
+    return resp
+
+@app.route("/metrics", methods=["GET"])
+async def metrics() -> Response:
+    body, ctype = await _run(render)
+    return Response(body, status=200, content_type=ctype)
+
+@app.route("/ready", methods=["GET"])
+async def ready() -> Response:
+    ok = MODELS.ready()
+    return retornar({"ready": ok, "models": MODELS.status()}, 200 if ok else 503)
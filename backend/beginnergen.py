@@ -234,6 +234,16 @@ def _choose_object_for(verb, rng):
 def _cap(s): 
     return s[:1].upper() + s[1:] if s else s
 
+def _verb_phrase(vb, obj, adv):
+    vp = f"can {vb}" + (f" {obj}" if obj else "")
+    if adv:
+        vp = (f"{vp} {adv}") if adv in {"today","now"} else vp.replace("can ", f"can {adv} ", 1)
+
+    return vp.replace(" to the home", " home").replace(" to home", " home")
+
+def _render(subj, vb, obj, adv):
+    return f"{_cap(subj)} {_verb_phrase(vb, obj, adv)}."
+
 def generate_sentence_beginner(seed=None):
     rng = random.Random(seed)
 
@@ -241,13 +251,8 @@ def generate_sentence_beginner(seed=None):
     vb   = rng.choice(VERBS)
     adv  = rng.choice(_SAFE_ADVERBS)
     obj = _choose_object_for(vb, rng)
-    
-    vp = f"can {vb}" + (f" {obj}" if obj else "")
-    if adv:
-        vp = (f"{vp} {adv}") if adv in {"today","now"} else vp.replace("can ", f"can {adv} ", 1)
 
-    vp = vp.replace(" to the home", " home").replace(" to home", " home")
-    return f"{_cap(subj)} {vp}."
+    return _render(subj, vb, obj, adv)
 
 SUJETOS = [
     "Father",
@@ -552,4 +557,113 @@ def conseguirPalabraRandom(categoria: str) -> str:
         case "direccion":
             return f"Where is {random.choice(LUGARES)}?"
         case _:
-            return ""
\ No newline at end of file
+            return ""
+
+# --- Espacio enumerable -----------------------------------------------------------------
+# generate_sentence_beginner y conseguirPalabraRandom muestrean de espacios finitos. Estas
+# clases los exponen completos: tamaño exacto, índice -> frase, frase -> índice y recorrido
+# por shards contiguos (para precachear todo lo que puede devolver `/`).
+
+class SentenceSpace:
+    def __init__(self, dims, render):
+        self.dims = [list(d) for d in dims]
+        self.render = render
+        self._lookup = None
+
+    def __len__(self):
+        n = 1
+        for d in self.dims:
+            n *= len(d)
+        return n
+
+    def _parts(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(f"índice fuera de rango: {i}")
+        parts = []
+        for d in reversed(self.dims):  # la última dimensión varía más rápido
+            i, r = divmod(i, len(d))
+            parts.append(d[r])
+        return parts[::-1]
+
+    def at(self, i):
+        return self.render(*self._parts(i))
+
+    def index(self, sentence):
+        if self._lookup is None:
+            self._lookup = {s: i for i, s in self.iter()}
+        try:
+            return self._lookup[sentence]
+        except KeyError:
+            raise ValueError(f"fuera del espacio: {sentence!r}") from None
+
+    def iter(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield i, self.at(i)
+
+    def shard_range(self, k, n):
+        """Rango contiguo k de n (0 <= k < n); los n shards cubren el espacio sin solaparse."""
+        if not 0 <= k < n:
+            raise ValueError(f"shard inválido: {k}/{n}")
+        total = len(self)
+        return range(total * k // n, total * (k + 1) // n)
+
+    def shard(self, k, n):
+        r = self.shard_range(k, n)
+        return self.iter(r.start, r.stop)
+
+def _objects_for(verb):
+    out = []
+    for choice in _COMPAT.get(verb, ["thing_use"]):
+        for obj in (_OBJ.get(choice) or [choice]):
+            if obj not in out:
+                out.append(obj)
+    return out
+
+class _BeginnerSpace(SentenceSpace):
+    def __init__(self):
+        verb_objs = [(vb, obj) for vb in VERBS for obj in _objects_for(vb)]
+        adverbs = list(dict.fromkeys(_SAFE_ADVERBS))
+        super().__init__(
+            [_SAFE_SUBJECTS, verb_objs, adverbs],
+            lambda subj, vo, adv: _render(subj, vo[0], vo[1], adv),
+        )
+        # Índice inverso sin materializar todo el espacio: sujeto por prefijo + tabla de
+        # sintagmas verbales (verbo, objeto, adverbio)
+        self._subjects = {_cap(s): i for i, s in enumerate(self.dims[0])}
+        self._vps = {
+            _verb_phrase(vb, obj, adv): (j, k)
+            for j, (vb, obj) in enumerate(verb_objs)
+            for k, adv in enumerate(adverbs)
+        }
+
+    def index(self, sentence):
+        n_vo, n_adv = len(self.dims[1]), len(self.dims[2])
+        if sentence.endswith("."):
+            words = sentence[:-1].split(" ")
+            for cut in range(1, len(words)):
+                i = self._subjects.get(" ".join(words[:cut]))
+                jk = self._vps.get(" ".join(words[cut:])) if i is not None else None
+                if jk is not None:
+                    return (i * n_vo + jk[0]) * n_adv + jk[1]
+        raise ValueError(f"fuera del espacio: {sentence!r}")
+
+BEGINNER_SPACE = _BeginnerSpace()
+
+WORD_SPACES = {
+    "sujeto":    SentenceSpace([SUJETOS],   lambda w: w),
+    "verbo":     SentenceSpace([VERBOS],    lambda w: w),
+    "color":     SentenceSpace([COLORES],   lambda w: w),
+    "familia":   SentenceSpace([FAMILIA],   lambda w: w),
+    "adjetivo":  SentenceSpace([ADJETIVOS], lambda w: w),
+    "direccion": SentenceSpace([LUGARES],   lambda w: f"Where is {w}?"),
+}
+
+def sentence_space(tipo):
+    """Espacio que recorre `/` para un `tipo` dado ("frase" o una categoría de palabras)."""
+    if tipo == "frase":
+        return BEGINNER_SPACE
+    try:
+        return WORD_SPACES[tipo]
+    except KeyError:
+        raise ValueError(f"tipo desconocido: {tipo!r}") from None
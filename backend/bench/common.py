@@ -0,0 +1,28 @@
+# common.py
+# Utilidades compartidas por los benchmarks: percentiles, metadatos de la máquina y
+# lectura/escritura de baselines JSON.
+import json, math, os, platform, time
+from typing import List, Optional
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Percentil por rango más cercano (nearest-rank) de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def machine_meta() -> dict:
+    return {
+        "python": platform.python_version(), "machine": platform.machine(),
+        "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def save_json(path: str, report: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"baseline guardado en {path}")
+
+def load_json(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,127 @@
+# fake_ltengine.py
+# LTEngine de mentira para los benchmarks: responde POST /translate con el texto marcado
+# con el idioma destino ("[es] hola"), con latencia y tasa de error configurables, y
+# cuenta cuántas llamadas y textos le llegan (GET /stats, POST /reset).
+# Uso suelto:
+#   python bench/fake_ltengine.py --port 5050 --latency-ms 80 --jitter-ms 20 --error-rate 0.01
+#   LTENGINE_URI=http://127.0.0.1:5050 python app.py
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse, json, random, threading, time
+
+class FakeLTEngine:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 50.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread = None
+
+    @property
+    def uri(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {"calls": 0, "texts": 0, "errors": 0, "inflight": 0, "max_inflight": 0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _draw(self):
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        return max(0.0, delay) / 1000.0, fail
+
+    def _translate(self, body: dict):
+        q, target = body.get("q"), body.get("target") or "en"
+        with self._lock:
+            s = self._stats
+            s["calls"] += 1
+            s["texts"] += len(q) if isinstance(q, list) else 1
+            s["inflight"] += 1
+            s["max_inflight"] = max(s["max_inflight"], s["inflight"])
+        try:
+            delay, fail = self._draw()
+            time.sleep(delay)
+            if fail:
+                with self._lock:
+                    self._stats["errors"] += 1
+                return 500, {"error": "fake LTEngine: error simulado"}
+            if isinstance(q, list):
+                return 200, {"translatedText": [f"[{target}] {x}" for x in q]}
+            return 200, {"translatedText": f"[{target}] {q}"}
+        finally:
+            with self._lock:
+                self._stats["inflight"] -= 1
+
+    def _handler(self):
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, obj: dict) -> None:
+                raw = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    return self._send(200, engine.stats())
+                self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path == "/reset":
+                    engine.reset()
+                    return self._send(200, engine.stats())
+                if self.path != "/translate":
+                    return self._send(404, {"error": "not found"})
+                try:
+                    data = json.loads(body or b"{}")
+                except ValueError:
+                    return self._send(400, {"error": "bad json"})
+                self._send(*engine._translate(data))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeLTEngine":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-ltengine", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5050)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    fake = FakeLTEngine(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"fake LTEngine en {fake.uri}", flush=True)
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
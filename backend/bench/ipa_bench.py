@@ -0,0 +1,209 @@
+# ipa_bench.py
+# Microbenchmarks de las funciones calientes de ipa.py por idioma.
+#
+# Para cada (función, idioma) recorre un corpus fijo tres veces:
+#   cold  - con las lru_cache, el análisis CJK y el léxico de IPA vacíos (los modelos ya cargados: su
+#           tiempo de carga sale aparte, en "models")
+#   warm  - la misma pasada otra vez, ya con todo en caché (--warm-rounds vueltas)
+#   mem   - otra pasada en frío bajo tracemalloc: pico y lo que queda retenido
+# y apunta µs por llamada (p50/p95/media). El léxico va a un directorio temporal para
+# que "cold" no dependa de lo que haya en ./.cache.
+#
+# Uso (desde backend/):
+#   python bench/ipa_bench.py --save bench/baselines/ipa.json
+#   python bench/ipa_bench.py -l ja,zh -f pronounce,space_japanese_for_flutter --compare bench/baselines/ipa.json
+import argparse, os, sys, tempfile, time, tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ["IPA_LEXICON_DIR"] = tempfile.mkdtemp(prefix="bench-lexicon-")
+
+import ipa
+from beginnergen import generate_sentence_beginner
+from registry import MODELS
+from common import percentile, machine_meta, save_json, load_json
+
+def _dict_lines(name: str, n: int) -> List[str]:
+    with open(os.path.join(BACKEND, "dicts", name), encoding="utf-8") as f:
+        return [l.strip() for l in f if l.strip()][:n]
+
+# Los generadores de frases y dicts/ son en inglés; para el resto, frases fijas del estilo
+# de las que devuelve `/` (sujeto + verbo + objeto + adverbio)
+_FIXED = {
+    "es": [
+        "El gato duerme en el sofá.", "Mi hermano cocina la cena despacio.",
+        "¿Dónde está la estación de tren?", "Ella lee un libro cada noche.",
+        "Nosotros compramos pan en la panadería.", "Los niños juegan en el parque.",
+        "El profesor abre la puerta con cuidado.", "Quiero una taza de café, por favor.",
+        "Mañana vamos a la playa.", "Mi abuela bebe té por la tarde.",
+    ],
+    "ja": [
+        "猫がソファーで寝ています。", "兄はゆっくり夕食を作ります。",
+        "駅はどこですか？", "彼女は毎晩本を読みます。",
+        "私たちはパン屋でパンを買います。", "子供たちは公園で遊んでいます。",
+        "先生は丁寧にドアを開けます。", "コーヒーを一杯ください。",
+        "明日は海に行きます。", "祖母は午後にお茶を飲みます。",
+    ],
+    "zh": [
+        "猫在沙发上睡觉。", "我哥哥慢慢地做晚饭。",
+        "火车站在哪里？", "她每天晚上看书。",
+        "我们在面包店买面包。", "孩子们在公园里玩。",
+        "老师小心地打开门。", "请给我一杯咖啡。",
+        "明天我们去海边。", "奶奶下午喝茶。",
+    ],
+    "ko": [
+        "고양이가 소파에서 자고 있어요.", "형은 천천히 저녁을 만들어요.",
+        "기차역이 어디에 있어요?", "그녀는 매일 밤 책을 읽어요.",
+        "우리는 빵집에서 빵을 사요.", "아이들이 공원에서 놀아요.",
+        "선생님이 조심스럽게 문을 열어요.", "커피 한 잔 주세요.",
+        "내일 우리는 바다에 가요.", "할머니는 오후에 차를 마셔요.",
+    ],
+}
+
+def corpus(lang: str, n: int) -> List[str]:
+    """Hasta `n` textos distintos (repetidos, la pasada "cold" ya acertaría en la lru_cache)."""
+    if lang == "en":
+        # mitad frases de `/`, el resto frases hechas y palabras sueltas de dicts/
+        half = max(1, n // 2)
+        out = list(dict.fromkeys(generate_sentence_beginner(seed=i) for i in range(half)))
+        out += _dict_lines("palabras3.txt", (n - len(out) + 1) // 2)
+        out += _dict_lines("palabras2.txt", n - len(out))
+        return out[:n]
+    return _FIXED[lang][:n]
+
+# (función, idiomas en los que tiene sentido)
+CASES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("pronounce", ("en", "es", "ja", "zh", "ko")),
+    ("ipa_word", ("en", "es")),
+    ("romanize_ja_tokens", ("ja",)),
+    ("romanize_zh_tokens", ("zh",)),
+    ("space_japanese_for_flutter", ("ja",)),
+    ("space_chinese_for_flutter", ("zh",)),
+]
+
+def _call(name: str, lang: str) -> Callable[[str], object]:
+    fn = getattr(ipa, name)
+    if name in ("pronounce", "ipa_word"):
+        return lambda s: fn(s, lang)
+    return fn
+
+def reset_caches() -> None:
+    """Vacía todo lo que hace que la segunda llamada sea barata (no los modelos)."""
+    ipa.ipa_word.cache_clear()
+    ipa.clear_analysis_cache()
+    with ipa._lexicon_lock:
+        ipa._lexicon_mem.clear()
+    if ipa._lexicon_disk is not None:
+        ipa._lexicon_disk.clear()
+
+def _timings(call: Callable[[str], object], texts: List[str], rounds: int = 1) -> dict:
+    lat = []
+    for _ in range(rounds):
+        for s in texts:
+            t0 = time.perf_counter()
+            call(s)
+            lat.append(time.perf_counter() - t0)
+    lat.sort()
+    us = lambda v: round(v * 1e6, 1)
+    return {"calls": len(lat), "p50_us": us(percentile(lat, 50)), "p95_us": us(percentile(lat, 95)),
+            "mean_us": us(sum(lat) / len(lat)), "total_ms": round(sum(lat) * 1000, 2)}
+
+def _memory(call: Callable[[str], object], texts: List[str]) -> dict:
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for s in texts:
+            call(s)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kb": round((peak - base) / 1024, 1), "retained_kb": round((current - base) / 1024, 1)}
+
+def bench_case(name: str, lang: str, texts: List[str], warm_rounds: int) -> dict:
+    call = _call(name, lang)
+    reset_caches()
+    cold = _timings(call, texts)
+    warm = _timings(call, texts, warm_rounds)
+    reset_caches()
+    mem = _memory(call, texts)
+    return {"function": name, "lang": lang, "cold": cold, "warm": warm, "memory": mem}
+
+def load_models() -> Dict[str, dict]:
+    """Carga cada modelo por separado para que su coste no caiga en la primera pasada."""
+    for name in ipa.IPA_MODELS:
+        MODELS.warm([name])  # si falla queda en FAILED y sus casos salen con error
+    status = MODELS.status()
+    return {n: status[n] for n in ipa.IPA_MODELS if n in status}
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> List[str]:
+    """Regresiones de p50 (frío y caliente) y del pico de memoria más allá de `tolerance`."""
+    index = {(r["function"], r["lang"]): r for r in baseline.get("results", []) if "error" not in r}
+    problems = []
+    for r in results:
+        b = index.get((r["function"], r["lang"]))
+        if b is None or "error" in r:
+            continue
+        tag = f'{r["function"]}[{r["lang"]}]'
+        for phase in ("cold", "warm"):
+            new, old = r[phase]["p50_us"], b[phase]["p50_us"]
+            if old and new > old * (1 + tolerance):
+                problems.append(f"{tag} {phase}: p50 {new} µs > {old} µs")
+        new, old = r["memory"]["peak_kb"], b["memory"]["peak_kb"]
+        if old and new > old * (1 + tolerance):
+            problems.append(f"{tag}: pico {new} KB > {old} KB")
+    return problems
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-l", "--langs", default="en,es,ja,zh,ko")
+    ap.add_argument("-f", "--functions", default=",".join(n for n, _ in CASES))
+    ap.add_argument("-n", "--size", type=int, default=40, help="textos por corpus")
+    ap.add_argument("--warm-rounds", type=int, default=5)
+    ap.add_argument("--save", help="guarda los resultados como baseline JSON")
+    ap.add_argument("--compare", help="baseline JSON con el que comparar (sale con 1 si hay regresiones)")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    langs = {l.strip() for l in args.langs.split(",") if l.strip()}
+    functions = {f.strip() for f in args.functions.split(",") if f.strip()}
+
+    models = load_models()
+    for name, st in models.items():
+        print(f"modelo {name:<10} {st['state']:<7} {st['seconds']} s  {st['error'] or ''}", flush=True)
+
+    results = []
+    for name, case_langs in CASES:
+        if name not in functions:
+            continue
+        for lang in case_langs:
+            if lang not in langs:
+                continue
+            try:
+                r = bench_case(name, lang, corpus(lang, args.size), args.warm_rounds)
+            except Exception as e:
+                r = {"function": name, "lang": lang, "error": f"{type(e).__name__}: {e}"}
+                print(f"{name:<27} {lang:<3} ERROR {r['error']}", flush=True)
+                results.append(r)
+                continue
+            results.append(r)
+            c, w, m = r["cold"], r["warm"], r["memory"]
+            print(f"{name:<27} {lang:<3} cold p50={c['p50_us']:>9} p95={c['p95_us']:>9} µs  "
+                  f"warm p50={w['p50_us']:>7} µs  pico={m['peak_kb']} KB retenido={m['retained_kb']} KB",
+                  flush=True)
+
+    report = {"meta": {"size": args.size, "warm_rounds": args.warm_rounds, **machine_meta()},
+              "models": models, "results": results}
+    if args.save:
+        save_json(args.save, report)
+    if args.compare:
+        problems = compare(results, load_json(args.compare), args.tolerance)
+        for p in problems:
+            print(f"[REGRESIÓN] {p}")
+        if problems:
+            return 1
+        print("sin regresiones frente al baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
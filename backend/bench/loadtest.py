@@ -0,0 +1,244 @@
+# loadtest.py
+# Benchmark de endpoints contra un LTEngine falso (fake_ltengine.py).
+#
+# Por cada nivel de concurrencia arranca el backend (Flask o ASGI) con una caché vacía en
+# un directorio temporal, manda cada endpoint en frío y luego otra vez en caliente con las
+# mismas frases, y apunta throughput, p50/p95/p99 y cuántas llamadas le llegaron al motor.
+# Cada frase se repite --repeat veces seguidas, así que a la vez llegan peticiones
+# idénticas y se ve si el coalescing hace su trabajo (en frío, llamadas al motor ~= frases
+# distintas x destinos).
+#
+# Uso (desde backend/):
+#   python bench/loadtest.py -c 1,8,32 -n 200 --save bench/baselines/local.json
+#   python bench/loadtest.py -c 8 --server asgi --compare bench/baselines/local.json
+#   python bench/loadtest.py -e /translate,/ocr --latency-ms 120 --error-rate 0.02
+#   python bench/loadtest.py --env LT_BATCH_WINDOW_MS=5 --env PRON_PROCS=4
+import argparse, io, itertools, os, shutil, socket, subprocess, sys
+import tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import requests
+from common import percentile, machine_meta, save_json, load_json
+from fake_ltengine import FakeLTEngine
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("/translate", "/", "/retranslate", "/ocr")
+
+# Frases fijas: mismas peticiones en cada corrida para poder comparar con el baseline
+CORPUS = [
+    "The cat is sleeping on the sofa.", "I would like a cup of coffee.",
+    "Where is the train station?", "My brother works in a hospital.",
+    "We are going to the beach tomorrow.", "She reads a book every night.",
+    "The weather is very nice today.", "Can you help me with this?",
+    "They bought a new car last week.", "I don't understand the question.",
+    "The children play in the park.", "He always forgets his keys.",
+    "This restaurant is very expensive.", "Please close the window.",
+    "My phone battery is almost empty.", "The museum opens at nine.",
+    "We need more time to finish.", "Her garden is full of flowers.",
+    "The teacher explains the lesson slowly.", "I will call you after dinner.",
+]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _ocr_image() -> bytes:
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", (640, 160), "white")
+    ImageDraw.Draw(img).text((20, 60), "The cat is sleeping on the sofa.", fill="black")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+class Server:
+    """El backend en un subproceso, con su propia caché y apuntando al LTEngine falso."""
+
+    def __init__(self, kind: str, lt_uri: str, extra_env: Dict[str, str]):
+        self.kind = kind
+        self.port = _free_port()
+        self.cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+        env = {**os.environ, "LTENGINE_URI": lt_uri, "CACHE_DIR": self.cache_dir, **extra_env}
+        env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        if kind == "asgi":
+            cmd = [sys.executable, "-m", "hypercorn", "asgi:app", "--bind", f"127.0.0.1:{self.port}"]
+        else:
+            cmd = [sys.executable, "-c",
+                   f"import app; app.app.run(host='127.0.0.1', port={self.port}, threaded=True)"]
+        self.proc = subprocess.Popen(cmd, cwd=BACKEND, env=env,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def wait_ready(self, timeout: float = 120.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                err = self.proc.stderr.read().decode(errors="replace")[-2000:]
+                raise RuntimeError(f"el backend terminó al arrancar:\n{err}")
+            try:
+                if requests.get(self.url + "/ready", timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("el backend no respondió a /ready a tiempo")
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+def _requests_for(endpoint: str, n: int, repeat: int, targets: List[str], image: bytes) -> List[Callable]:
+    """Lista de llamadas (session -> Response) para un endpoint."""
+    sentences = itertools.cycle(s for s in CORPUS for _ in range(repeat))
+    tgts = itertools.cycle(targets)
+    out = []
+    for _ in range(n):
+        s, t = next(sentences), next(tgts)
+        if endpoint == "/translate":
+            body = {"q": s, "source": "en", "target": t}
+            out.append(lambda ss, url, b=body: ss.post(url + "/translate", json=b))
+        elif endpoint == "/":
+            body = {"tipo": "frase", "originalLanguage": "en", "target": t}
+            out.append(lambda ss, url, b=body: ss.post(url + "/", json=b))
+        elif endpoint == "/retranslate":
+            body = {"sentence": s, "sourceLang": "en", "targetLang": t}
+            out.append(lambda ss, url, b=body: ss.post(url + "/retranslate", json=b))
+        elif endpoint == "/ocr":
+            out.append(lambda ss, url, tg=t: ss.post(
+                url + "/ocr", params={"originalLanguage": "en", "target": tg},
+                data=image, headers={"Content-Type": "image/png"}))
+        else:
+            raise ValueError(f"endpoint desconocido: {endpoint}")
+    return out
+
+def run_phase(url: str, calls: List[Callable], concurrency: int, timeout: float) -> dict:
+    local = threading.local()
+
+    def _one(call) -> tuple:
+        ss = getattr(local, "session", None)
+        if ss is None:
+            ss = local.session = requests.Session()
+            ss.request = _with_timeout(ss.request, timeout)
+        t0 = time.perf_counter()
+        try:
+            r = call(ss, url)
+            ok = r.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - t0, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(_one, calls))
+    wall = time.perf_counter() - t0
+    lat = sorted(dt for dt, _ in results)
+    ms = lambda v: None if v is None else round(v * 1000, 2)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "seconds": round(wall, 3),
+        "rps": round(len(results) / wall, 1) if wall > 0 else None,
+        "p50_ms": ms(percentile(lat, 50)),
+        "p95_ms": ms(percentile(lat, 95)),
+        "p99_ms": ms(percentile(lat, 99)),
+    }
+
+def _with_timeout(request, timeout: float):
+    def _req(method, url, **kw):
+        kw.setdefault("timeout", timeout)
+        return request(method, url, **kw)
+    return _req
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> List[str]:
+    """Regresiones frente a un baseline: más latencia p95, menos throughput o más llamadas
+    al motor que el margen `tolerance` (0.2 = 20 %)."""
+    index = {(r["endpoint"], r["phase"], r["concurrency"]): r for r in baseline.get("results", [])}
+    problems = []
+    for r in results:
+        b = index.get((r["endpoint"], r["phase"], r["concurrency"]))
+        if b is None:
+            continue
+        tag = f'{r["endpoint"]} {r["phase"]} c={r["concurrency"]}'
+        if b.get("p95_ms") and r["p95_ms"] is not None and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            problems.append(f'{tag}: p95 {r["p95_ms"]} ms > {b["p95_ms"]} ms')
+        if b.get("rps") and r["rps"] is not None and r["rps"] < b["rps"] * (1 - tolerance):
+            problems.append(f'{tag}: {r["rps"]} req/s < {b["rps"]} req/s')
+        if r["lt_calls"] > b.get("lt_calls", 0) * (1 + tolerance):
+            problems.append(f'{tag}: {r["lt_calls"]} llamadas a LTEngine > {b.get("lt_calls")}')
+        if r["errors"] > b.get("errors", 0):
+            problems.append(f'{tag}: {r["errors"]} errores > {b.get("errors")}')
+    return problems
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-c", "--concurrency", default="1,8,32", help="niveles de concurrencia, separados por coma")
+    ap.add_argument("-n", "--requests", type=int, default=200, help="peticiones por endpoint y fase")
+    ap.add_argument("-e", "--endpoints", default=",".join(ENDPOINTS))
+    ap.add_argument("-t", "--targets", default="es,fr", help="idiomas destino, en rotación")
+    ap.add_argument("--repeat", type=int, default=4, help="veces seguidas que se manda cada frase")
+    ap.add_argument("--server", choices=("flask", "asgi"), default="flask")
+    ap.add_argument("--env", action="append", default=[], help="VAR=valor extra para el backend")
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="latencia del LTEngine falso")
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="timeout por petición (s)")
+    ap.add_argument("--save", help="guarda los resultados como baseline JSON")
+    ap.add_argument("--compare", help="baseline JSON con el que comparar (sale con 1 si hay regresiones)")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args()
+
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    extra_env = dict(kv.split("=", 1) for kv in args.env)
+    image = _ocr_image() if "/ocr" in endpoints else b""
+
+    fake = FakeLTEngine(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate).start()
+    results = []
+    try:
+        for c in levels:
+            server = Server(args.server, fake.uri, extra_env)
+            try:
+                server.wait_ready()
+                for phase in ("cold", "warm"):
+                    for ep in endpoints:
+                        calls = _requests_for(ep, args.requests, args.repeat, targets, image)
+                        before = fake.stats()["calls"]
+                        r = run_phase(server.url, calls, c, args.timeout)
+                        r.update(endpoint=ep, phase=phase, concurrency=c,
+                                 lt_calls=fake.stats()["calls"] - before)
+                        results.append(r)
+                        print(f"{ep:<13} {phase:<4} c={c:<3} {r['rps']:>8} req/s  "
+                              f"p50={r['p50_ms']}  p95={r['p95_ms']}  p99={r['p99_ms']} ms  "
+                              f"errores={r['errors']}  LTEngine={r['lt_calls']}", flush=True)
+            finally:
+                server.stop()
+    finally:
+        fake.stop()
+
+    report = {
+        "meta": {
+            "server": args.server, "requests": args.requests, "repeat": args.repeat,
+            "targets": targets, "env": extra_env, "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms, "error_rate": args.error_rate, **machine_meta(),
+        },
+        "results": results,
+    }
+    if args.save:
+        save_json(args.save, report)
+    if args.compare:
+        problems = compare(results, load_json(args.compare), args.tolerance)
+        for p in problems:
+            print(f"[REGRESIÓN] {p}")
+        if problems:
+            return 1
+        print("sin regresiones frente al baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+# cachestore.py
+# Claves y formato de la caché de payloads.
+#
+# v1 (el de siempre): cada traducción guarda el payload completo en th:<hash(frase, origen,
+#   destino)>, a veces el payload inverso, y un puntero rev: para la dirección contraria;
+#   la pronunciación va aparte en th:<hash(texto, idioma, "pron:idioma")>.
+# v2: un solo registro por frase normalizada e idioma, s2:<hash(idioma, frase)>, con el
+#   texto a mostrar, su IPA/romanización y un mapa idioma -> traducción. Los payloads de
+#   ambas direcciones se arman al leer a partir de dos registros, sin repetir listas.
+#
+# Los endpoints usan la misma interfaz para los dos (payload / pivot_payload / put /
+# forget / pron / set_pron); CACHE_SCHEMA elige cuál. v2 sigue leyendo lo que haya en v1
+# y lo pasa a v2 al vuelo; migrate_cache.py convierte una caché entera.
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib, re, unicodedata
+
+_WS = re.compile(r"\s+")
+_PUNCT = ".,;:!?…'\"()[]{}"
+_PRON_KEYS = ("originalIpa","translatedIpa","originalRomanization","translatedRomanization")
+
+Pron = Tuple[List[str], List[str]]
+
+def _upd_str(h, s: str) -> None:
+    s = " ".join(s.split())
+    b = s.encode("utf-8")
+    h.update(len(b).to_bytes(4, "big")); h.update(b)
+
+def _upd_list(h, seq: Optional[List[str]]) -> None:
+    if not seq:
+        h.update((0).to_bytes(4, "big"))
+        return
+    h.update(len(seq).to_bytes(4, "big"))
+    for item in seq:
+        _upd_str(h, item)
+
+def _norm_text(s: str) -> str:
+    s = unicodedata.normalize("NFKC", (s or "").strip())
+    s = s.strip(_PUNCT).lower()
+    s = _WS.sub(" ", s)            # colapsa espacios repetidos
+    return s
+
+def cache_key(
+    text: str, source: str, target: str,
+    originalIpa: Optional[List[str]] = None,
+    translatedIpa: Optional[List[str]] = None,
+    originalRomanization: Optional[List[str]] = None,
+    translatedRomanization: Optional[List[str]] = None,
+) -> str:
+    s_norm = (source or "").strip().lower()
+    t_norm = (target or "").strip().lower()
+    txt    = _norm_text(text)
+
+    h = hashlib.blake2b(digest_size=16)
+    _upd_str(h, s_norm); _upd_str(h, t_norm); _upd_str(h, txt)
+    _upd_list(h, originalIpa); _upd_list(h, translatedIpa)
+    _upd_list(h, originalRomanization); _upd_list(h, translatedRomanization)
+    return "th:" + h.hexdigest()
+
+def build_payload(originalText=None, translatedText=None,
+                  detectedLanguage=None, target=None,
+                  originalIpa=None, translatedIpa = None, originalRomanization=None, translatedRomanization=None, error=None) -> dict:
+    payload = {
+        "originalText": originalText,
+        "translatedText": translatedText,
+        "detectedLanguage": detectedLanguage,
+        "target": target,
+        "originalRomanization": originalRomanization,
+        "translatedRomanization": translatedRomanization,
+        "originalIpa": originalIpa,
+        "translatedIpa": translatedIpa
+    }
+    if error is not None:
+        payload["error"] = f"Error generando frase: {str(error)}"
+    return payload
+
+def _pron_value(po: Optional[object]) -> Optional[Pron]:
+    if isinstance(po, dict):
+        v1 = po.get('ipa'); v2 = po.get('roman') # type: ignore
+        if isinstance(v1, list) and (not v1 or isinstance(v1[0], str)) \
+           and isinstance(v2, list) and (not v2 or isinstance(v2[0], str)):
+            return v1, v2
+    return None
+
+def is_full(payload: Optional[object]) -> bool:
+    return isinstance(payload, dict) and all(k in payload for k in _PRON_KEYS)
+
+def pron_key(text: str, lang: str) -> str:
+    return cache_key(text, lang, f"pron:{lang}")
+
+def _swap(p: dict) -> dict:
+    return build_payload(
+        p["translatedText"], p["originalText"], p["target"], p["detectedLanguage"],
+        p["translatedIpa"], p["originalIpa"], p["translatedRomanization"], p["originalRomanization"],
+    )
+
+class StoreV1:
+    schema = "v1"
+
+    def __init__(self, cache, display: Optional[Callable[[str, str], str]] = None,
+                 pron: Optional[Callable[[str, str], Pron]] = None):
+        self.cache = cache
+        self.display = display or (lambda text, lang: text)
+        self.pron_fn = pron
+
+    def payload(self, text: str, source: str, target: str, key_text: Optional[str] = None,
+                follow_rev: bool = True) -> Optional[dict]:
+        key = cache_key(key_text or text, source, target)
+        hit = self.cache.get(key)
+        if is_full(hit):
+            return hit
+        if not follow_rev:
+            return None
+
+        display_src = self.display(text, source)
+        rev = self.cache.get("rev:" + cache_key(display_src, source, target))
+        if not isinstance(rev, dict):
+            return None
+        ptr = rev.get("payload_key")
+        back = self.cache.get(ptr) if isinstance(ptr, str) else None
+        translated_text = rev.get("orig_text") or ""
+        if is_full(back):
+            payload = build_payload(
+                display_src, translated_text, source, target,
+                back["translatedIpa"], back["originalIpa"],
+                back["translatedRomanization"], back["originalRomanization"]
+            )
+        elif self.pron_fn is not None:
+            oIpa, oRom = self.pron_fn(display_src, source)
+            tIpa, tRom = self.pron_fn(self.display(translated_text, target), target)
+            payload = build_payload(display_src, translated_text, source, target, oIpa, tIpa, oRom, tRom)
+        else:
+            return None
+        self.cache.set(key, payload)
+        return payload
+
+    def pivot_payload(self, text: str, pivot_lang: str, source: str, target: str) -> Optional[dict]:
+        # En v1 `/` ya guarda con la frase pivote (inglés) como clave
+        return self.payload(text, source, target)
+
+    def put(self, payload: dict, key_text: Optional[str] = None,
+            pivot: Optional[Tuple[str, str]] = None, reverse: bool = False) -> None:
+        src, tgt = payload["detectedLanguage"], payload["target"]
+        o, t = payload["originalText"] or "", payload["translatedText"] or ""
+        key = cache_key(key_text or o, src, tgt)
+        self.cache.set(key, payload)
+        if src == tgt:
+            return
+        if reverse:
+            # payload inverso completo + puntero a él (lo que escribe el precache)
+            k_rev = cache_key(t, tgt, src)
+            self.cache.set(k_rev, _swap(payload))
+            self.cache.set("rev:" + cache_key(o, src, tgt), {"payload_key": k_rev, "orig_text": t})
+        else:
+            self.cache.set("rev:" + cache_key(t, tgt, src), {"payload_key": key, "orig_text": o})
+
+    def forget(self, text: str, source: str, target: str) -> None:
+        key = cache_key(text, source, target)
+        prev = self.cache.get(key)
+        self.cache.delete(key)
+        if isinstance(prev, dict):
+            prev_trans = (
+                prev.get("translatedText") or prev.get("translated_text")
+                or prev.get("translated") or prev.get("display_translated") or ""
+            )
+            if prev_trans:
+                prev_trans = self.display(prev_trans, target)
+                self.cache.delete("rev:" + cache_key(prev_trans, target, source))
+
+    def pron(self, text: str, lang: str) -> Optional[Pron]:
+        return _pron_value(self.cache.get(pron_key(text, lang)))
+
+    def set_pron(self, text: str, lang: str, ipa: List[str], roman: List[str]) -> None:
+        self.cache.add(pron_key(text, lang), {'ipa': ipa, 'roman': roman})
+
+def _is_cjk(lang: str) -> bool:
+    return lang in ("ja", "jpx") or lang.startswith("zh")
+
+def record_key(text: str, lang: str) -> str:
+    lang = (lang or "").strip().lower()
+    t = _norm_text(text)
+    if _is_cjk(lang):
+        # el espaciado para Flutter solo mete espacios: "日本語" y "日本 語" son la misma frase
+        t = "".join(t.split())
+    h = hashlib.blake2b(digest_size=16)
+    _upd_str(h, lang); _upd_str(h, t)
+    return "s2:" + h.hexdigest()
+
+class StoreV2:
+    """Registro por frase e idioma: {"t": texto, "l": idioma, "i": ipa, "r": romanización,
+    "x": {idioma: traducción}}. "i"/"r" faltan hasta que se calcula la pronunciación."""
+    schema = "v2"
+
+    def __init__(self, cache, legacy: Optional[StoreV1] = None):
+        self.cache = cache
+        self.legacy = legacy  # lectura de lo escrito con v1 (None = no mirar)
+        # el read-modify-write lee del Cache de disco: la capa en memoria de HotCache puede
+        # tener una versión vieja escrita por otro proceso
+        self.disk = cache.disk if hasattr(cache, "hot_stats") else cache
+
+    def record(self, text: str, lang: str) -> Optional[dict]:
+        rec = self.cache.get(record_key(text, lang))
+        return rec if isinstance(rec, dict) else None
+
+    def _upsert(self, text: str, lang: str, pron: Optional[Pron] = None,
+                links: Optional[Dict[str, str]] = None) -> None:
+        key = record_key(text, lang)
+        with self.cache.transact():
+            old = self.disk.get(key)
+            if not isinstance(old, dict):
+                old = {"t": text, "l": lang, "x": {}}
+            # copia: la capa en memoria comparte el dict con los lectores
+            rec = {**old, "x": dict(old.get("x") or {})}
+            if pron is not None and rec.get("i") is None:
+                rec["i"], rec["r"] = pron
+            for lg, tx in (links or {}).items():
+                if lg != lang and tx is not None:
+                    rec["x"][lg] = tx
+            if rec != old:
+                self.cache.set(key, rec)
+
+    @staticmethod
+    def _build(rec_o: Optional[dict], rec_t: Optional[dict], source: str, target: str) -> Optional[dict]:
+        if not rec_o or not rec_t or rec_o.get("i") is None or rec_t.get("i") is None:
+            return None
+        return build_payload(rec_o["t"], rec_t["t"], source, target,
+                             rec_o["i"], rec_t["i"], rec_o["r"], rec_t["r"])
+
+    def _resolve(self, rec_o: Optional[dict], source: str, target: str) -> Optional[dict]:
+        if rec_o is None:
+            return None
+        if source == target:
+            return self._build(rec_o, rec_o, source, target)
+        t = rec_o["x"].get(target)
+        return None if t is None else self._build(rec_o, self.record(t, target), source, target)
+
+    def _upgrade(self, payload: Optional[dict], key_text: Optional[str] = None,
+                 pivot: Optional[Tuple[str, str]] = None) -> Optional[dict]:
+        if payload is not None:
+            self.put(payload, key_text, pivot)
+        return payload
+
+    def payload(self, text: str, source: str, target: str, key_text: Optional[str] = None,
+                follow_rev: bool = True) -> Optional[dict]:
+        hit = self._resolve(self.record(text, source), source, target)
+        if hit is not None or self.legacy is None:
+            return hit
+        # solo la clave directa de v1: el puntero rev: pide segmentar el texto CJK
+        return self._upgrade(self.legacy.payload(text, source, target, key_text, follow_rev=False))
+
+    def pivot_payload(self, text: str, pivot_lang: str, source: str, target: str) -> Optional[dict]:
+        rec_p = self.record(text, pivot_lang)
+        if rec_p is not None:
+            o = rec_p["t"] if source == pivot_lang else rec_p["x"].get(source)
+            if o is not None:
+                rec_o = rec_p if source == pivot_lang else self.record(o, source)
+                hit = None
+                if rec_o is not None and source == target:
+                    hit = self._build(rec_o, rec_o, source, target)
+                elif rec_o is not None:
+                    t = rec_p["t"] if target == pivot_lang else rec_p["x"].get(target)
+                    if t is not None:
+                        rec_t = rec_p if target == pivot_lang else self.record(t, target)
+                        hit = self._build(rec_o, rec_t, source, target)
+                if hit is not None:
+                    return hit
+        if self.legacy is None:
+            return None
+        return self._upgrade(self.legacy.payload(text, source, target, follow_rev=False),
+                             pivot=(pivot_lang, text))
+
+    def put(self, payload: dict, key_text: Optional[str] = None,
+            pivot: Optional[Tuple[str, str]] = None, reverse: bool = False) -> None:
+        src, tgt = payload["detectedLanguage"], payload["target"]
+        o, t = payload["originalText"] or "", payload["translatedText"] or ""
+        nodes = {src: (o, (payload["originalIpa"], payload["originalRomanization"]))}
+        if tgt != src:
+            nodes[tgt] = (t, (payload["translatedIpa"], payload["translatedRomanization"]))
+        links: Dict[str, Dict[str, str]] = {lg: {} for lg in nodes}
+        if pivot is not None:
+            # `/`: las dos frases salen del pivote (inglés); se enlazan solo con él, así no
+            # pisan la traducción directa entre ellas
+            p_lang, p_text = pivot
+            for lg, (tx, _) in nodes.items():
+                if lg != p_lang:
+                    links[lg][p_lang] = p_text
+                    links.setdefault(p_lang, {})[lg] = tx
+            if p_lang not in nodes:
+                self._upsert(p_text, p_lang, links=links.pop(p_lang))
+        elif tgt != src:
+            links[src][tgt] = t
+            links[tgt][src] = o
+        for lg, (tx, pron) in nodes.items():
+            ok = all(isinstance(v, list) for v in pron)
+            self._upsert(tx, lg, pron if ok else None, links.get(lg))
+
+    def forget(self, text: str, source: str, target: str) -> None:
+        # Del disco, como en _upsert: la copia en memoria de este proceso puede no tener
+        # los enlaces o la pron que otro worker añadió después
+        rec_o = self.disk.get(record_key(text, source))
+        t = rec_o["x"].get(target) if isinstance(rec_o, dict) else None
+        for tx, lg, other in ((text, source, target), (t, target, source)):
+            if tx is None:
+                continue
+            key = record_key(tx, lg)
+            with self.cache.transact():
+                rec = self.disk.get(key)
+                if isinstance(rec, dict) and other in rec.get("x", {}):
+                    x = dict(rec["x"]); x.pop(other, None)
+                    self.cache.set(key, {**rec, "x": x})
+        if self.legacy is not None:
+            self.legacy.forget(text, source, target)
+
+    def pron(self, text: str, lang: str) -> Optional[Pron]:
+        rec = self.record(text, lang)
+        if rec is not None and rec.get("i") is not None:
+            return rec["i"], rec["r"]
+        if self.legacy is None:
+            return None
+        hit = self.legacy.pron(text, lang)
+        if hit is not None:
+            self._upsert(text, lang, hit)
+        return hit
+
+    def set_pron(self, text: str, lang: str, ipa: List[str], roman: List[str]) -> None:
+        self._upsert(text, lang, (ipa, roman))
+
+def make_store(schema: str, cache, display=None, pron=None):
+    v1 = StoreV1(cache, display, pron)
+    if (schema or "v1").strip().lower() == "v2":
+        return StoreV2(cache, legacy=v1)
+    return v1
@@ -0,0 +1,154 @@
+# hotcache.py
+# Capa en memoria (LRU acotada) delante del diskcache.Cache compartido.
+# Guarda los objetos ya deserializados, así las frases y palabras frecuentes se sirven
+# sin leer SQLite ni hacer unpickle. Todas las escrituras/borrados pasan por aquí, de modo
+# que /retranslate invalida también esta capa; el TTL acota lo viejo que puede quedar un
+# valor cuando otro proceso escribe sobre el mismo directorio.
+# Lleva además contadores por espacio de claves (el prefijo antes de ":": th, rev, MISS,
+# s2...) para ver qué aciertos salen de memoria, cuáles del disco y cuántos fallan.
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Callable, Optional
+import sys, threading, time
+import orjson
+
+_MISSING = object()
+_COUNTERS = ("hot_hits", "disk_hits", "misses", "writes", "deletes")
+
+def namespace(key: Any) -> str:
+    if not isinstance(key, str):
+        return "other"
+    ns, sep, _ = key.partition(":")
+    return ns if sep else "other"
+
+def _approx_size(value: Any) -> int:
+    try:
+        return len(orjson.dumps(value))
+    except Exception:
+        return sys.getsizeof(value)
+
+class HotCache:
+    def __init__(self, disk, max_items: int = 20_000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0):
+        self.disk = disk
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[Any, float, int]]" = OrderedDict()  # key -> (valor, vence, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts: "defaultdict[str, Counter]" = defaultdict(Counter)
+        self.observer: Optional[Callable[[str, str], None]] = None  # p.ej. metrics.cache_event
+
+    def _count(self, key: Any, what: str) -> None:
+        ns = namespace(key)
+        with self._lock:
+            self._counts[ns][what] += 1
+        if self.observer is not None:
+            self.observer(ns, what)
+
+    def __getattr__(self, name: str):
+        # transact(), volume(), directory, etc. van directo al Cache de disco
+        return getattr(self.disk, name)
+
+    def __contains__(self, key: str) -> bool:
+        return self._peek(key) is not _MISSING or key in self.disk
+
+    def _peek(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            value, expires, _ = item
+            if expires <= time.monotonic():
+                self._drop(key)
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def _put(self, key: str, value: Any, expire: Optional[float]) -> None:
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if expire is None else min(self.ttl, expire)
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_items or self._bytes > self.max_bytes):
+                _, (_, _, old) = self._data.popitem(last=False)
+                self._bytes -= old
+
+    def get(self, key: str, default: Any = None, **kwargs) -> Any:
+        if kwargs:
+            return self.disk.get(key, default, **kwargs)
+        value = self._peek(key)
+        if value is not _MISSING:
+            self._count(key, "hot_hits")
+            return value
+        value, expire_time = self.disk.get(key, _MISSING, expire_time=True)
+        if value is _MISSING:
+            self._count(key, "misses")
+            return default
+        self._count(key, "disk_hits")
+        self._put(key, value, None if expire_time is None else expire_time - time.time())
+        return value
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None, **kwargs) -> bool:
+        ok = self.disk.set(key, value, expire=expire, **kwargs)
+        if ok:
+            self._count(key, "writes")
+            self._put(key, value, expire)
+        return ok
+
+    def add(self, key: str, value: Any, expire: Optional[float] = None, **kwargs) -> bool:
+        ok = self.disk.add(key, value, expire=expire, **kwargs)
+        if ok:
+            self._count(key, "writes")
+            self._put(key, value, expire)
+        return ok
+
+    def delete(self, key: str, **kwargs) -> bool:
+        with self._lock:
+            self._drop(key)
+        self._count(key, "deletes")
+        return self.disk.delete(key, **kwargs)
+
+    def clear_hot(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def hot_stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._data), "bytes": self._bytes,
+                    "max_items": self.max_items, "max_bytes": self.max_bytes}
+
+    def namespace_stats(self) -> dict:
+        """Contadores por espacio de claves desde que arrancó el proceso."""
+        with self._lock:
+            counts = {ns: dict(c) for ns, c in self._counts.items()}
+        out = {}
+        for ns, c in sorted(counts.items()):
+            row = {k: c.get(k, 0) for k in _COUNTERS}
+            reads = row["hot_hits"] + row["disk_hits"] + row["misses"]
+            row["hit_ratio"] = round((row["hot_hits"] + row["disk_hits"]) / reads, 4) if reads else None
+            out[ns] = row
+        return out
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+def disk_usage(disk) -> dict:
+    """Entradas y bytes por espacio de claves en el Cache de disco (recorre la tabla)."""
+    rows = disk._sql(
+        "SELECT CASE WHEN typeof(key) = 'text' AND instr(key, ':') > 0"
+        "  THEN substr(key, 1, instr(key, ':') - 1) ELSE 'other' END AS ns,"
+        " COUNT(*), SUM(size + COALESCE(length(value), 0))"
+        " FROM Cache GROUP BY ns"
+    ).fetchall()
+    return {ns: {"items": n, "bytes": b or 0} for ns, n, b in sorted(rows)}
@@ -1,33 +1,62 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Sequence
-import re
-from phonemizer import phonemize
+import os, queue, re, threading
+from contextlib import contextmanager
+from diskcache import Cache
+from phonemizer.backend import EspeakBackend
 from phonemizer.separator import Separator
 from pypinyin import lazy_pinyin, Style
 from unicodedata import normalize
-from g2pk2 import G2p
 from hangul_romanize import Transliter
 from hangul_romanize.rule import academic
-from fugashi import Tagger # type: ignore
-import epitran
-import jieba
-from pykakasi import kakasi
 from functools import lru_cache
+from registry import MODELS, READY
 
+# Código de voz de espeak-ng para cada idioma de SUPPORTED que pasa por phonemizer
 LANG_MAP = {
     'es': 'es',
     'en': 'en-us',
+    'fr': 'fr-fr',
+    'de': 'de',
+    'it': 'it',
+    'pt': 'pt',
+    'ru': 'ru',
+    'ar': 'ar',
+    'hi': 'hi',
 }
 
 _PUNCT = ';:,.!?¡¿—…"«»“”()[]{}<>-\''
 _SEP = Separator(phone=' ', word='|', syllable='')
 
-_g2p_ko = G2p()
-_epi_ko = epitran.Epitran('kor-Hang')
+def _load_g2p_ko():
+    from g2pk2 import G2p
+    return G2p()
+
+def _load_epi_ko():
+    import epitran
+    return epitran.Epitran('kor-Hang')
+
+def _load_ja_tagger():
+    from fugashi import Tagger # type: ignore
+    return Tagger()
+
+def _load_kakasi():
+    from pykakasi import kakasi
+    return kakasi()
+
+def _load_jieba():
+    import jieba
+    jieba.initialize()
+    return jieba
+
+# Se cargan al primer uso (o en el warmup), no al importar ipa
+_g2p_ko = MODELS.register("g2p_ko", _load_g2p_ko)
+_epi_ko = MODELS.register("epi_ko", _load_epi_ko)
 _ko_trans = Transliter(academic)
-_ja_tagger = Tagger()
-kks = kakasi()
+_ja_tagger = MODELS.register("ja_tagger", _load_ja_tagger)
+kks = MODELS.register("kakasi", _load_kakasi)
+jieba = MODELS.register("jieba", _load_jieba)
 
 _JA_PUNCT = re.compile(r'^[\u3000-\u303F。、・「」『』（）\[\]{}…—\-\.\,\!\?]+$')
 _CJK_PUNCT = _JA_PUNCT
@@ -37,6 +66,23 @@ _JA_FEAT_KEYS = ("reading","pron","pronunciation","yomi","kana","kanaBase","orth
 
 JIEBA_HMM = False
 
+def warmup() -> None:
+    """Fuerza la carga de los modelos perezosos (diccionario de jieba, MeCab, kakasi, g2p)."""
+    MODELS.warm(IPA_MODELS)
+    # Solo se prueban los modelos que cargaron: uno que falte (p.ej. sin epitran) no debe
+    # tumbar el warmup, que en pronpool es el initializer de cada worker
+    probes = (
+        (("ja_tagger",), lambda: _ja_tagger("準備")),
+        (("kakasi",), lambda: kks.convert("じゅんび")),
+        (("g2p_ko", "epi_ko"), lambda: _epi_ko.transliterate(_g2p_ko("준비"))),
+    )
+    for names, probe in probes:
+        if all(MODELS.state(n) == READY for n in names):
+            try:
+                probe()
+            except Exception:
+                pass
+
 def kata_to_hira(s: str) -> str:
     out = []
     for ch in s or "":
@@ -72,33 +118,26 @@ def pronounce(sentence: str, lang_code: str) -> Pronunciation:
     base = (lang_code or '').split('-')[0].lower()
 
     if base in ('ja', 'jpx'):
-        toks = [w.surface.strip() for w in _ja_tagger(sentence)
-                if w.surface and not _JA_PUNCT.match(w.surface)]
+        toks = [w.strip() for w in analyze_ja(sentence).tokens
+                if w and not _JA_PUNCT.match(w)]
         if not toks:
             return Pronunciation(roman=[], ipa=[])
         roman = []
         for w in toks:
             try:
-                hira = kata_to_hira(w)
-                rom = "".join(d.get("hepburn","") for d in kks.convert(hira)).strip()
+                rom = _hepburn(kata_to_hira(w))
             except Exception:
                 rom = w
             roman.append(rom or w)
         return Pronunciation(roman=roman, ipa=[''] * len(roman))
 
     if base.startswith('zh'):
-        toks = [t.strip() for t in jieba.cut(sentence, HMM=JIEBA_HMM)
-                if t.strip() and not _CJK_PUNCT.match(t)]
-        if not toks:
+        a = analyze_zh(sentence)
+        pairs = [(t.strip(), p) for t, p in zip(a.tokens, a.readings)
+                 if t.strip() and not _CJK_PUNCT.match(t)]
+        if not pairs:
             return Pronunciation(roman=[], ipa=[])
-        roman = []
-        for w in toks:
-            if any('\u4e00' <= ch <= '\u9fff' for ch in w):
-                p = ' '.join(lazy_pinyin(w, style=Style.TONE)).strip()
-                roman.append(p or w)
-            else:
-                roman.append(w)
-        return Pronunciation(roman=roman, ipa=[])
+        return Pronunciation(roman=[p or t for t, p in pairs], ipa=[])
 
     orig_words = [t for t in sentence.split() if _is_word_token_py(t)]
     if not orig_words:
@@ -161,25 +200,61 @@ def ipa_word(sentence: str, lang_code: str) -> list[str]:
         base = 'en-us'
     elif base in ('es', 'es-ES', 'spa'):
         base = 'es'
+    else:
+        base = LANG_MAP.get(base, base)
+
+    ipas = _lexicon_lookup(tokens, base)
+    return [o for o in (ipas.get(t, '') for t in tokens) if o]
+
+# --- Backends de espeak persistentes ------------------------------------------------
+# phonemize() reconstruye el backend (y con njobs>1 lanza procesos) en cada llamada. Aquí
+# se crean una vez por idioma y se reutilizan; cada EspeakBackend carga su propia copia de
+# la librería, así que un pool de ESPEAK_POOL_SIZE instancias por idioma puede trabajar en
+# paralelo sin compartir estado de espeak entre hilos.
+ESPEAK_POOL_SIZE = max(1, int(os.getenv("ESPEAK_POOL_SIZE", "2")))
+_espeak_free: dict[str, queue.LifoQueue] = {}
+_espeak_count: dict[str, int] = {}
+_espeak_broken: set[str] = set()
+_espeak_lock = threading.Lock()
+
+def _new_espeak(lang: str) -> EspeakBackend:
+    return EspeakBackend(
+        lang,
+        punctuation_marks=_PUNCT,
+        preserve_punctuation=False,
+        with_stress=True,
+    )
 
-    out = None
+@contextmanager
+def _espeak(lang: str):
+    with _espeak_lock:
+        if lang in _espeak_broken:
+            raise RuntimeError(f"espeak: idioma no disponible: {lang}")
+        free = _espeak_free.setdefault(lang, queue.LifoQueue())
+        create = free.empty() and _espeak_count.get(lang, 0) < ESPEAK_POOL_SIZE
+        if create:
+            _espeak_count[lang] = _espeak_count.get(lang, 0) + 1
+    if create:
+        try:
+            backend = _new_espeak(lang)
+        except Exception:
+            with _espeak_lock:
+                _espeak_count[lang] -= 1
+                _espeak_broken.add(lang)
+            raise
+    else:
+        backend = free.get()
     try:
-        out = phonemize(
-            tokens,
-            language=base,
-            backend='espeak',
-            strip=True,
-            with_stress=True,
-            njobs=4,
-            punctuation_marks=_PUNCT,
-            preserve_punctuation=False,
-            separator=_SEP,
-        )
-    except:
-        out = None
+        yield backend
+    finally:
+        free.put(backend)
 
-    if out is None:
-        return []
+def _phonemize_words(words: list[str], lang: str) -> list[str] | None:
+    try:
+        with _espeak(lang) as backend:
+            out = backend.phonemize(words, separator=_SEP, strip=True, njobs=1)
+    except:
+        return None
 
     if isinstance(out, str):
         out = [out]
@@ -190,52 +265,60 @@ def ipa_word(sentence: str, lang_code: str) -> list[str]:
             o = " ".join(s for s in o if isinstance(s, str))
         elif not isinstance(o, str):
             o = str(o)
-        o = o.replace('|', '').strip()
-        if o:
-            norm_out.append(o)
-
-    return norm_out
+        norm_out.append(o.replace('|', '').strip())
+    return norm_out if len(norm_out) == len(words) else None
 
-@lru_cache(maxsize=50000)
-def romanize_ja_tokens(sentence: str) -> list[str]:
-    s = (sentence or "").strip()
-    if not s:
-        return []
-    toks = list(_ja_tagger(s))
-    out: list[str] = []
-    for w in toks:
-        surface = (w.surface or "").strip()
-        if not surface or _JA_PUNCT.match(surface):
-            continue
-        feat = getattr(w, "feature", None)
-        reading = None
-        for k in _JA_FEAT_KEYS:
-            v = safe_feat_get(feat, k)
-            if v:
-                reading = v.strip()
-                break
-        hira = kata_to_hira(reading or surface)
-        romaji = "".join(d.get("hepburn","") for d in kks.convert(hira)).strip()
-        out.append(romaji or surface)
-    return [''.join(t.split()) for t in out if t]
-
-@lru_cache(maxsize=50000)
-def romanize_zh_tokens(sentence: str) -> list[str]:
-    s = (sentence or "").strip()
-    if not s:
-        return []
-    toks = list(jieba.cut(s, HMM=JIEBA_HMM))
-    out: list[str] = []
-    for tok in toks:
-        t = tok.strip()
-        if not t or _CJK_PUNCT.match(t):
-            continue
-        if any('\u4e00' <= ch <= '\u9fff' for ch in t):
-            p = ' '.join(lazy_pinyin(t, style=Style.TONE)).strip()
-            out.append(p or t)
+def _load_espeak() -> bool:
+    # Deja creado (y devuelto al pool) un backend para los idiomas más usados
+    for lang in ('en-us', 'es'):
+        with _espeak(lang):
+            pass
+    return True
+
+MODELS.register("espeak", _load_espeak)
+IPA_MODELS = ("jieba", "ja_tagger", "kakasi", "g2p_ko", "epi_ko", "espeak")
+
+# --- Léxico persistente palabra -> IPA ------------------------------------------------
+# Las frases generadas reutilizan un vocabulario pequeño: se guarda el IPA por (palabra,
+# idioma) en disco (compartido entre procesos y reinicios) con una capa en memoria, y a
+# espeak solo llegan las palabras desconocidas, todas en una sola llamada.
+_LEXICON_DIR = os.getenv("IPA_LEXICON_DIR", os.path.join(os.getenv("CACHE_DIR", "./.cache"), "lexicon"))
+_LEXICON_MEM_MAX = 200_000
+_lexicon_disk = Cache(_LEXICON_DIR) if _LEXICON_DIR else None
+_lexicon_mem: dict[str, str] = {}
+_lexicon_lock = threading.Lock()
+
+def _lexicon_lookup(words: list[str], lang: str) -> dict[str, str]:
+    found: dict[str, str] = {}
+    unknown: list[str] = []
+    for w in dict.fromkeys(words):
+        k = f"{lang}\x00{w}"
+        v = _lexicon_mem.get(k)
+        if v is None and _lexicon_disk is not None:
+            v = _lexicon_disk.get(k)
+            if isinstance(v, str):
+                _lexicon_remember(k, v)
+        if isinstance(v, str):
+            found[w] = v
         else:
-            out.append(t)
-    return [" ".join(t.split()) for t in out if t]
+            unknown.append(w)
+
+    if unknown:
+        ipas = _phonemize_words(unknown, lang)
+        if ipas is not None:
+            for w, v in zip(unknown, ipas):
+                k = f"{lang}\x00{w}"
+                found[w] = v
+                _lexicon_remember(k, v)
+                if _lexicon_disk is not None:
+                    _lexicon_disk.set(k, v)
+    return found
+
+def _lexicon_remember(k: str, v: str) -> None:
+    with _lexicon_lock:
+        if len(_lexicon_mem) >= _LEXICON_MEM_MAX:
+            _lexicon_mem.pop(next(iter(_lexicon_mem)))
+        _lexicon_mem[k] = v
 
 def safe_feat_get(feat, key: str) -> None | str:
     if feat is None:
@@ -257,11 +340,23 @@ def _is_word_char_u(code: int) -> bool:
 def _is_word_token(s: str) -> bool:
     return bool(s) and _is_word_char_u(ord(s[0]))
 
-@lru_cache(maxsize=50000)
-def space_japanese_for_flutter(text: str) -> str:
-    toks = [w.surface for w in _ja_tagger(text or "")]
+# --- Análisis CJK compartido -----------------------------------------------------------
+# Una frase ja/zh se tokeniza una sola vez (MeCab o jieba) y de ese análisis salen el
+# espaciado para Flutter, romanize_*_tokens y pronounce. El texto espaciado apunta al mismo
+# análisis: pronounce recibe justo ese texto y así no vuelve a tokenizarlo.
+_ANALYSIS_MEM_MAX = int(os.getenv("CJK_ANALYSIS_CACHE", "50000"))
+_analysis_mem: dict[tuple[str, str], "CJKAnalysis"] = {}
+_analysis_lock = threading.Lock()
+
+@dataclass(frozen=True)
+class CJKAnalysis:
+    tokens: tuple[str, ...]    # superficies en orden, tal como salen del tokenizador
+    readings: tuple[str, ...]  # ja: lectura de MeCab en hiragana; zh: pinyin con tono ('' si no es han)
+    spaced: str                # espacio entre dos tokens de palabra seguidos (Flutter)
+
+def _spaced(toks: Sequence[str], text: str) -> str:
     if not toks:
-        return text or ""
+        return text
     out = [toks[0]]
     for prev, cur in zip(toks, toks[1:]):
         if _is_word_token(prev) and _is_word_token(cur):
@@ -270,15 +365,89 @@ def space_japanese_for_flutter(text: str) -> str:
             out.append(cur)
     return "".join(out)
 
+def _analysis_get(lang: str, text: str) -> CJKAnalysis | None:
+    return _analysis_mem.get((lang, text))
+
+def _analysis_remember(lang: str, text: str, a: CJKAnalysis) -> None:
+    with _analysis_lock:
+        for k in ((lang, text), (lang, a.spaced)):
+            if k in _analysis_mem:
+                continue
+            if len(_analysis_mem) >= _ANALYSIS_MEM_MAX:
+                _analysis_mem.pop(next(iter(_analysis_mem)))
+            _analysis_mem[k] = a
+
+def _ja_reading(w) -> str:
+    surface = (w.surface or "").strip()
+    feat = getattr(w, "feature", None)
+    for k in _JA_FEAT_KEYS:
+        v = safe_feat_get(feat, k)
+        if v:
+            return kata_to_hira(v.strip())
+    return kata_to_hira(surface)
+
+def analyze_ja(text: str) -> CJKAnalysis:
+    text = text or ""
+    a = _analysis_get("ja", text)
+    if a is None:
+        words = list(_ja_tagger(text))
+        toks = tuple(w.surface for w in words)
+        a = CJKAnalysis(toks, tuple(_ja_reading(w) for w in words), _spaced(toks, text))
+        _analysis_remember("ja", text, a)
+    return a
+
+def _zh_reading(tok: str) -> str:
+    t = tok.strip()
+    if not any('\u4e00' <= ch <= '\u9fff' for ch in t):
+        return ''
+    return ' '.join(lazy_pinyin(t, style=Style.TONE)).strip()
+
+def analyze_zh(text: str) -> CJKAnalysis:
+    text = text or ""
+    a = _analysis_get("zh", text)
+    if a is None:
+        toks = tuple(jieba.cut(text, HMM=JIEBA_HMM))
+        a = CJKAnalysis(toks, tuple(_zh_reading(t) for t in toks), _spaced(toks, text))
+        _analysis_remember("zh", text, a)
+    return a
+
+def clear_analysis_cache() -> None:
+    with _analysis_lock:
+        _analysis_mem.clear()
+    _hepburn.cache_clear()
+
 @lru_cache(maxsize=50000)
+def _hepburn(hira: str) -> str:
+    return "".join(d.get("hepburn","") for d in kks.convert(hira)).strip()
+
+def romanize_ja_tokens(sentence: str) -> list[str]:
+    s = (sentence or "").strip()
+    if not s:
+        return []
+    a = analyze_ja(s)
+    out: list[str] = []
+    for surface, hira in zip(a.tokens, a.readings):
+        surface = (surface or "").strip()
+        if not surface or _JA_PUNCT.match(surface):
+            continue
+        out.append(_hepburn(hira) or surface)
+    return [''.join(t.split()) for t in out if t]
+
+def romanize_zh_tokens(sentence: str) -> list[str]:
+    s = (sentence or "").strip()
+    if not s:
+        return []
+    a = analyze_zh(s)
+    out: list[str] = []
+    for tok, p in zip(a.tokens, a.readings):
+        t = tok.strip()
+        if not t or _CJK_PUNCT.match(t):
+            continue
+        out.append(p or t)
+    return [" ".join(t.split()) for t in out if t]
+
+def space_japanese_for_flutter(text: str) -> str:
+    return analyze_ja(text).spaced
+
 def space_chinese_for_flutter(text: str) -> str:
-    toks = [t for t in jieba.cut(text or "", HMM=JIEBA_HMM)]
-    if not toks:
-        return text or ""
-    out = [toks[0]]
-    for prev, cur in zip(toks, toks[1:]):
-        if _is_word_token(prev) and _is_word_token(cur):
-            out.append(" " + cur)
-        else:
-            out.append(cur)
-    return "".join(out)
+    return analyze_zh(text).spaced
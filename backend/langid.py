@@ -0,0 +1,93 @@
+# langid.py
+# Detección de idioma para source="auto" (/translate) y el texto del OCR.
+# Primero se mira la escritura de cada carácter (vectorizado con numpy sobre los
+# codepoints): hangul -> ko, kana -> ja, han sin kana -> zh, cirílico -> ru, árabe -> ar,
+# devanagari -> hi. Solo el texto en alfabeto latino pasa por langdetect, que es lento y
+# poco fiable con frases cortas. El resultado se memoriza por texto normalizado
+# (cachestore._norm_text), así repetir la misma consulta no cuesta nada.
+from functools import lru_cache
+import os
+import numpy as np
+from langdetect import DetectorFactory, detect_langs
+from cachestore import _norm_text
+
+DetectorFactory.seed = 0
+
+DETECT_CACHE = int(os.getenv("DETECT_CACHE", "100000"))
+P_GAP = 0.20  # si langdetect duda entre dos idiomas por menos de esto, se queda en inglés
+
+OTHER, LATIN, HANGUL, KANA, HAN, CYRILLIC, ARABIC, DEVANAGARI = range(8)
+
+# (desde, hasta, escritura), rangos inclusivos sin solaparse
+_RANGES = sorted([
+    (0x0041, 0x005A, LATIN), (0x0061, 0x007A, LATIN), (0x00C0, 0x024F, LATIN),
+    (0x1E00, 0x1EFF, LATIN),
+    (0x0400, 0x052F, CYRILLIC),
+    (0x0600, 0x06FF, ARABIC), (0x0750, 0x077F, ARABIC), (0xFB50, 0xFDFF, ARABIC),
+    (0xFE70, 0xFEFF, ARABIC),
+    (0x0900, 0x097F, DEVANAGARI),
+    (0x1100, 0x11FF, HANGUL), (0x3130, 0x318F, HANGUL), (0xAC00, 0xD7AF, HANGUL),
+    (0x3040, 0x30FF, KANA), (0x31F0, 0x31FF, KANA), (0xFF66, 0xFF9F, KANA),
+    (0x3400, 0x4DBF, HAN), (0x4E00, 0x9FFF, HAN), (0xF900, 0xFAFF, HAN),
+    (0x20000, 0x2FA1F, HAN),
+])
+# Frontera i = inicio del rango i; un codepoint cae en el rango anterior a su posición
+_STARTS = np.array([a for a, _, _ in _RANGES], dtype=np.uint32)
+_ENDS = np.array([b for _, b, _ in _RANGES], dtype=np.uint32)
+_SCRIPT = np.array([s for _, _, s in _RANGES], dtype=np.int8)
+
+_BY_SCRIPT = {CYRILLIC: "ru", ARABIC: "ar", DEVANAGARI: "hi"}
+
+def script_counts(text: str) -> np.ndarray:
+    """Cuántas letras de cada escritura tiene `text` (índice = constante de escritura)."""
+    cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    idx = np.searchsorted(_STARTS, cps, side="right") - 1
+    inside = (idx >= 0) & (cps <= _ENDS[np.maximum(idx, 0)])
+    scripts = np.where(inside, _SCRIPT[np.maximum(idx, 0)], OTHER)
+    return np.bincount(scripts, minlength=8)
+
+def _latin(text: str) -> str:
+    probs = detect_langs(text)
+    ranked = sorted(probs, key=lambda p: p.prob, reverse=True)
+    if len(ranked) > 1 and (ranked[0].prob - ranked[1].prob) < P_GAP:
+        return "en"
+    return ranked[0].lang
+
+def classify(text: str) -> str:
+    counts = script_counts(text)
+    counts[OTHER] = 0
+    if not counts.any():
+        return "en"
+    # Japonés mezcla kana con kanji y el coreano a veces lleva hanja: la kana y el hangul
+    # deciden aunque haya más han
+    if counts[KANA]:
+        return "ja"
+    if counts[HANGUL] and counts[HANGUL] >= counts[HAN] // 2:
+        return "ko"
+    top = int(counts.argmax())
+    if top == HAN:
+        return "zh"
+    if top in _BY_SCRIPT:
+        return _BY_SCRIPT[top]
+    if top == HANGUL:
+        return "ko"
+    return _latin(text)
+
+@lru_cache(maxsize=DETECT_CACHE)
+def _detect_norm(norm: str) -> str:
+    return classify(norm)
+
+def detect_lang(text: str) -> str:
+    """Código de idioma de `text` (los que no sepa decidir acaban en "en")."""
+    norm = _norm_text(text)
+    if not norm:
+        return "en"
+    try:
+        return _detect_norm(norm)
+    except Exception:
+        # langdetect falla sin rasgos (solo símbolos): mismo valor que antes
+        return "en"
+
+def cache_info() -> dict:
+    info = _detect_norm.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max": info.maxsize}
@@ -0,0 +1,74 @@
+# leases.py
+# Coalescing entre procesos: varios workers sobre el mismo directorio de caché eligen un
+# líder por clave con un registro "LEASE:<nombre>" creado con Cache.add() (atómico en
+# SQLite). El resto espera a que el líder publique el resultado en la caché, con el mismo
+# tiempo máximo que los followers dentro del proceso; si vence, siguen por su cuenta.
+# Va directo al Cache de disco: la capa en memoria de HotCache no se comparte.
+from typing import Callable, Iterator, Optional, TypeVar
+import itertools, os, time
+
+T = TypeVar("T")
+
+_PREFIX = "LEASE:"
+_seq = itertools.count()
+
+class Leases:
+    def __init__(self, disk, ttl: float, enabled: bool = True):
+        self.disk = disk
+        self.ttl = ttl  # acota lo que dura el lease de un líder que murió sin soltarlo
+        self.enabled = enabled
+        self.observer: Optional[Callable[[bool], None]] = None  # recibe True si somos líder
+
+    def acquire(self, name: str) -> Optional[str]:
+        """Devuelve un token si somos el líder, None si otro proceso ya tiene el lease."""
+        token = f"{os.getpid()}:{next(_seq)}"
+        if not self.enabled:
+            return token
+        try:
+            won = self.disk.add(_PREFIX + name, token, expire=self.ttl)
+        except Exception:
+            return token  # sin caché compartida: cada proceso por su cuenta, como antes
+        if self.observer is not None:
+            self.observer(won)
+        return token if won else None
+
+    def release(self, name: str, token: Optional[str]) -> None:
+        if not token or not self.enabled:
+            return
+        key = _PREFIX + name
+        try:
+            with self.disk.transact():
+                if self.disk.get(key) == token:
+                    self.disk.delete(key)
+        except Exception:
+            pass
+
+    def held(self, name: str) -> bool:
+        try:
+            return (_PREFIX + name) in self.disk
+        except Exception:
+            return False
+
+    @staticmethod
+    def delays(timeout: float, first: float = 0.01, cap: float = 0.2) -> Iterator[float]:
+        """Pausas de sondeo con backoff hasta agotar `timeout`."""
+        deadline = time.monotonic() + timeout
+        delay = first
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            yield min(delay, left)
+            delay = min(delay * 2, cap)
+
+    def wait(self, name: str, ready: Callable[[], Optional[T]], timeout: float) -> Optional[T]:
+        """Espera al líder de `name`: devuelve ready() en cuanto no sea None, o None si el
+        lease se soltó sin resultado o venció el tiempo. Las excepciones de ready() suben."""
+        for delay in self.delays(timeout):
+            value = ready()
+            if value is not None:
+                return value
+            if not self.held(name):
+                return ready()
+            time.sleep(delay)
+        return ready()
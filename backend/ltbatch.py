@@ -0,0 +1,69 @@
+# ltbatch.py
+# Micro-batching de llamadas a LTEngine: junta las peticiones pendientes del mismo par
+# origen/destino durante una ventana corta (o hasta `max_batch`) y las manda como un solo
+# POST con `q` como lista. Cada llamador recibe su propio Future.
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+import threading, time
+
+PostMany = Callable[[List[str], str, str], List[dict]]
+
+class LTBatcher:
+    def __init__(self, post_many: PostMany, window: float, max_batch: int, workers: int = 8):
+        self.post_many = post_many
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[Tuple[str, str], List[Tuple[str, Future]]] = {}
+        self._deadline: Dict[Tuple[str, str], float] = {}
+        self._cv = threading.Condition()
+        # Pool propio: los llamadores suelen estar en PRON_POOL bloqueados en .result()
+        self._senders = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lt-batch")
+        threading.Thread(target=self._loop, name="lt-batcher", daemon=True).start()
+
+    def submit(self, text: str, source: str, target: str) -> Future:
+        fut: Future = Future()
+        pair = (source, target)
+        with self._cv:
+            items = self._pending.setdefault(pair, [])
+            items.append((text, fut))
+            if len(items) == 1:
+                self._deadline[pair] = time.monotonic() + self.window
+                self._cv.notify()
+            if len(items) >= self.max_batch:
+                self._flush(pair)
+        return fut
+
+    def _flush(self, pair: Tuple[str, str]) -> None:
+        # con self._cv tomado
+        items = self._pending.pop(pair, None)
+        self._deadline.pop(pair, None)
+        if items:
+            self._senders.submit(self._send, pair, items)
+
+    def _loop(self) -> None:
+        with self._cv:
+            while True:
+                now = time.monotonic()
+                for pair in [p for p, d in self._deadline.items() if d <= now]:
+                    self._flush(pair)
+                timeout = min(self._deadline.values(), default=now + 1.0) - now
+                self._cv.wait(timeout=max(0.0, timeout))
+
+    def _send(self, pair: Tuple[str, str], items: List[Tuple[str, Future]]) -> None:
+        by_text: Dict[str, List[Future]] = {}
+        for text, fut in items:
+            if fut.set_running_or_notify_cancel():
+                by_text.setdefault(text, []).append(fut)
+        if not by_text:
+            return
+        texts = list(by_text)
+        try:
+            results = self.post_many(texts, *pair)
+        except BaseException as e:
+            for futs in by_text.values():
+                for fut in futs:
+                    fut.set_exception(e)
+            return
+        for text, res in zip(texts, results):
+            for fut in by_text[text]:
+                fut.set_result(res)
@@ -0,0 +1,156 @@
+# metrics.py
+# Métricas Prometheus para /metrics: latencia por endpoint y por etapa (detección de
+# idioma, caché, LTEngine, espaciado CJK, pronunciación, OCR), lecturas de caché por
+# espacio de claves, códigos de respuesta de LTEngine, líderes/seguidores del coalescing
+# y cola de PRON_POOL.
+#
+# Con varios workers (gunicorn/hypercorn -w N) cada proceso tiene sus contadores; si se
+# define PROMETHEUS_MULTIPROC_DIR (un directorio vacío en cada arranque) prometheus_client
+# los escribe ahí y /metrics devuelve la suma de todos.
+#
+# Las mismas etapas se apuntan además en la petición en curso (ContextVar) para la cabecera
+# Server-Timing y el campo "debug": lo que corre en PRON_POOL u OCR se apunta en la
+# petición que lanzó el trabajo si se envía con contextvars.copy_context().run.
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, List, Optional, Tuple
+import os, time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+# Desde un hit de caché en memoria (~100 µs) hasta una frase larga en LTEngine con OCR
+_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+REQUEST_SECONDS = Histogram(
+    "waza_request_seconds", "Latencia por endpoint", ["endpoint", "method"], buckets=_BUCKETS)
+RESPONSES = Counter(
+    "waza_responses_total", "Respuestas por endpoint y código", ["endpoint", "status"])
+STAGE_SECONDS = Histogram(
+    "waza_stage_seconds", "Latencia por etapa dentro de una petición", ["stage"], buckets=_BUCKETS)
+CACHE_OPS = Counter(
+    "waza_cache_ops_total", "Operaciones de caché por espacio de claves (th, rev, MISS, s2...)",
+    ["namespace", "result"])
+LT_RESPONSES = Counter(
+    "waza_ltengine_responses_total", "Respuestas de LTEngine por código ('error' = sin respuesta)",
+    ["status"])
+COALESCE = Counter(
+    "waza_coalesce_total", "Trabajos pedidos a la vez: el líder lo hace, los seguidores esperan",
+    ["kind", "role"])
+PRON_QUEUE = Gauge(
+    "waza_pron_pool_queue", "Tareas esperando en PRON_POOL", multiprocess_mode="livesum")
+OCR_PENDING = Gauge(
+    "waza_ocr_pending", "Imágenes en OCR (en curso + en cola)", multiprocess_mode="livesum")
+
+# (etapa, segundos o None, descripción o None) de la petición en curso; None = no se apunta
+_TIMINGS: ContextVar[Optional[list]] = ContextVar("waza_timings", default=None)
+
+# Gauges que se muestrean al terminar cada petición: (gauge, función que da el valor)
+_samplers: List[Tuple[Gauge, Callable[[], float]]] = []
+
+def note(name: str, seconds: Optional[float] = None, desc: Optional[str] = None) -> None:
+    """Apunta una etapa (o solo un hecho, sin duración) en la petición en curso."""
+    entries = _TIMINGS.get()
+    if entries is not None:
+        entries.append((name, seconds, desc))
+
+@contextmanager
+def stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.labels(name).observe(dt)
+        note(name, dt)
+
+def timed(name: str, outcome: bool = False) -> Callable:
+    """Decorador: cada llamada cuenta como la etapa `name`. Con outcome=True la entrada
+    de Server-Timing dice hit/miss según devuelva algo o None (lecturas de caché)."""
+    def deco(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                dt = time.perf_counter() - t0
+                STAGE_SECONDS.labels(name).observe(dt)
+                note(name, dt, ("miss" if result is None else "hit") if outcome else None)
+        return wrapper
+    return deco
+
+def instrument(obj, outcome: Tuple[str, ...] = (), **stages: str):
+    """Envuelve métodos de una instancia: instrument(STORE, payload="cache_get", ...)."""
+    for method, name in stages.items():
+        setattr(obj, method, timed(name, method in outcome)(getattr(obj, method)))
+    return obj
+
+def start_timings() -> None:
+    _TIMINGS.set([])
+
+def timings(total: float) -> List[dict]:
+    """Etapas de la petición en curso agrupadas por nombre, en orden de aparición. Las que
+    corren en paralelo (p.ej. las dos pronunciaciones) suman su tiempo."""
+    grouped: dict = {}
+    for name, seconds, desc in _TIMINGS.get() or ():
+        e = grouped.setdefault(name, {"name": name, "ms": None, "n": 0, "desc": []})
+        e["n"] += 1
+        if seconds is not None:
+            e["ms"] = (e["ms"] or 0.0) + seconds * 1000
+        if desc and desc not in e["desc"]:
+            e["desc"].append(desc)
+    out = [{**e, "ms": None if e["ms"] is None else round(e["ms"], 2), "desc": ",".join(e["desc"])}
+           for e in grouped.values()]
+    out.append({"name": "total", "ms": round(total * 1000, 2), "n": 1, "desc": ""})
+    return out
+
+def server_timing(entries: List[dict]) -> str:
+    parts = []
+    for e in entries:
+        p = e["name"]
+        if e["ms"] is not None:
+            p += f";dur={e['ms']}"
+        desc = e["desc"] or (f"x{e['n']}" if e["n"] > 1 else "")
+        if desc:
+            p += f';desc="{desc}"'
+        parts.append(p)
+    return ", ".join(parts)
+
+def cache_event(namespace: str, result: str) -> None:
+    CACHE_OPS.labels(namespace, result).inc()
+
+def lt_status(status: Optional[int]) -> None:
+    LT_RESPONSES.labels(str(status) if status is not None else "error").inc()
+
+def coalesced(kind: str, leader: bool) -> None:
+    COALESCE.labels(kind, "leader" if leader else "follower").inc()
+    if not leader:
+        # el trabajo lo apunta la petición líder; aquí solo que esperamos el suyo
+        note("coalesced", desc=kind)
+
+def sample(gauge: Gauge, fn: Callable[[], float]) -> None:
+    _samplers.append((gauge, fn))
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float) -> None:
+    REQUEST_SECONDS.labels(endpoint, method).observe(seconds)
+    RESPONSES.labels(endpoint, str(status)).inc()
+    for gauge, fn in _samplers:
+        try:
+            gauge.set(fn())
+        except Exception:
+            pass
+
+def render() -> Tuple[bytes, str]:
+    """Cuerpo y Content-Type de /metrics."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
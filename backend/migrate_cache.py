@@ -0,0 +1,66 @@
+# migrate_cache.py
+# Pasa los payloads de la caché v1 (th:) a registros v2 (s2:), uno por frase e idioma.
+# Uso:
+#   python migrate_cache.py --dry-run            # solo cuenta
+#   python migrate_cache.py                      # escribe los s2:, deja lo v1 como está
+#   python migrate_cache.py --slim --drop-rev    # además adelgaza los th: y borra los rev:
+#
+# Solo se migran los payloads cuya clave sale de su propio originalText (las traducciones
+# directas); los que guardó `/` con la frase pivote en inglés como clave no dicen cuál era
+# esa frase, así que se quedan en v1 y StoreV2 los pasa al vuelo la primera vez que se
+# piden. Lo mismo con las pronunciaciones sueltas (la clave es un hash, sin el texto).
+# Con --slim los th: migrados se quedan en {"translatedText": ...}: es lo que usa
+# lt_translate como memo de LTEngine, así no se vuelve a llamar al motor.
+import argparse, os, sys, time
+from diskcache import Cache
+from cachestore import StoreV2, cache_key, is_full, _is_cjk
+
+def _direct_key(key: str, p: dict) -> bool:
+    o, src, tgt = p["originalText"] or "", p["detectedLanguage"], p["target"]
+    if cache_key(o, src, tgt) == key:
+        return True
+    # /translate guarda con la frase tal cual llegó; originalText es la versión espaciada
+    return _is_cjk(src or "") and cache_key("".join(o.split()), src, tgt) == key
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-d", "--dir", default=os.getenv("CACHE_DIR", "./.cache"), help="directorio de la caché")
+    ap.add_argument("--dry-run", action="store_true", help="no escribe nada, solo cuenta")
+    ap.add_argument("--slim", action="store_true", help="deja los th: migrados solo con translatedText")
+    ap.add_argument("--drop-rev", action="store_true", help="borra los punteros rev: (v2 no los usa)")
+    ap.add_argument("--progress", type=int, default=5000, help="cada cuántas claves informar")
+    args = ap.parse_args()
+
+    disk = Cache(args.dir)
+    store = StoreV2(disk)
+    keys = [k for k in disk.iterkeys() if isinstance(k, str) and k.startswith(("th:", "rev:"))]
+    print(f"{len(keys)} claves v1 en {args.dir}", flush=True)
+
+    n = {"migrated": 0, "pivot": 0, "rev": 0, "other": 0}
+    t0 = time.perf_counter()
+    for i, key in enumerate(keys, 1):
+        if key.startswith("rev:"):
+            n["rev"] += 1
+            if args.drop_rev and not args.dry_run:
+                disk.delete(key)
+        else:
+            p = disk.get(key)
+            if not is_full(p):
+                n["other"] += 1  # memo crudo de LTEngine o pronunciación
+            elif not _direct_key(key, p):
+                n["pivot"] += 1
+            else:
+                n["migrated"] += 1
+                if not args.dry_run:
+                    store.put(p)
+                    if args.slim:
+                        disk.set(key, {"translatedText": p["translatedText"]})
+        if args.progress and i % args.progress == 0:
+            print(f"  {i}/{len(keys)}  {n}  {time.perf_counter() - t0:.1f}s", flush=True)
+
+    tag = " (dry-run)" if args.dry_run else ""
+    print(f"Migración terminada{tag}: {n}  {time.perf_counter() - t0:.1f}s")
+    disk.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# ocrpool.py
+# Pool aislado para OCR: `workers` hilos dedicados, cada uno con su propia instancia de
+# PaddleOCR (no es seguro compartir una entre hilos), y una cola de espera acotada. Si
+# la cola está llena, submit() falla al instante con OCRBusy en vez de dejar la petición
+# esperando, así las fotos no se comen los hilos ni la CPU de /translate y /.
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+import contextvars, threading
+
+class OCRBusy(Exception):
+    """No queda sitio en la cola de OCR; reintentar más tarde."""
+
+class OCRPool:
+    def __init__(self, factory: Callable[[], Any], workers: int = 1, queue_max: int = 4):
+        self.factory = factory
+        self.workers = max(1, workers)
+        self.queue_max = max(0, queue_max)
+        self._exec = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        # plazas = en ejecución + esperando
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_max)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _model(self) -> Any:
+        model = getattr(self._local, "model", None)
+        if model is None:
+            model = self._local.model = self.factory()
+        return model
+
+    def _run(self, fn: Callable, args: tuple) -> Any:
+        return fn(self._model(), *args)
+
+    def _done(self, _fut: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Ejecuta fn(modelo, *args) en un hilo de OCR. Lanza OCRBusy si la cola está llena."""
+        if not self._slots.acquire(blocking=False):
+            raise OCRBusy()
+        with self._lock:
+            self._pending += 1
+        try:
+            # con el contexto de quien pide: las métricas por petición siguen funcionando
+            fut = self._exec.submit(contextvars.copy_context().run, self._run, fn, args)
+        except BaseException:
+            self._done(None)
+            raise
+        fut.add_done_callback(self._done)
+        return fut
+
+    def warm(self, timeout: float = 600.0) -> "OCRPool":
+        # Un trabajo por hilo que espera en la barrera: fuerza a crear todos los hilos
+        # y que cada uno cargue su modelo
+        barrier = threading.Barrier(self.workers)
+        def _load(_model):
+            barrier.wait(timeout=timeout)
+        futs = [self._exec.submit(self._run, _load, ()) for _ in range(self.workers)]
+        for f in futs:
+            f.result()
+        return self
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "queue_max": self.queue_max, "pending": self._pending}
@@ -0,0 +1,82 @@
+# ocrtext.py
+# Del resultado de PaddleOCR (rec_texts/rec_scores/rec_boxes) al texto que se traduce.
+#   1. fuera las cajas con poca confianza o geometría imposible (sin alto, demasiado
+#      pequeñas para ser texto legible): suelen ser ruido que luego llega a LTEngine
+#   2. el resto en orden de lectura: filas por el centro vertical y, dentro de cada fila,
+#      de izquierda a derecha (de derecha a izquierda en árabe)
+#   3. limpieza por idioma con una regex precompilada que se aplica de una vez a todo el texto
+# Todo con numpy sobre las N cajas a la vez, sin bucles por carácter.
+import os, re
+from typing import List
+import numpy as np
+
+OCR_MIN_SCORE = float(os.getenv("OCR_MIN_SCORE", "0.5"))
+OCR_MIN_HEIGHT = float(os.getenv("OCR_MIN_HEIGHT", "8"))  # px, sobre la imagen ya reducida
+ROW_TOLERANCE = 0.5  # dos cajas van en la misma fila si sus centros distan menos de esto x alto mediano
+
+LATIN_LANGS = {"en", "es", "fr", "de", "it", "pt"}
+
+_LATIN = "A-Za-z\u00C0-\u00D6\u00D8-\u00F6\u00F8-\u024F\u1E00-\u1EFF"
+_HAN = "\u3400-\u4DBF\u4E00-\u9FFF"
+# Lo que se conserva en cada idioma (además de los dígitos); lo demás pasa a ser un espacio
+_CHARS = {
+    "latin": _LATIN,
+    "ru": "\u0400-\u052F",
+    "ar": "\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF",
+    "hi": "\u0900-\u097F",
+    "ja": "\u3040-\u30FF\u31F0-\u31FF" + _HAN,
+    "zh": _HAN,
+    "ko": "\uAC00-\uD7AF\u1100-\u11FF\u3130-\u318F",
+}
+_DROP = {name: re.compile(f"[^{chars}\\d]+") for name, chars in _CHARS.items()}
+_DIGITS = re.compile(r"\d+")
+
+def _filter_name(lang: str) -> str:
+    if lang in LATIN_LANGS:
+        return "latin"
+    if lang in ("ja", "jpx"):
+        return "ja"
+    if lang.startswith("zh"):
+        return "zh"
+    return lang if lang in _DROP else "latin"
+
+def clean_by_lang(s: str, lang: str) -> str:
+    """Solo las letras de la escritura de `lang` y los dígitos, con los espacios normalizados."""
+    return " ".join(_DROP[_filter_name(lang)].sub(" ", s or "").split())
+
+def strip_digits(s: str) -> str:
+    return _DIGITS.sub("", s)
+
+def reading_order(res: dict, rtl: bool = False) -> List[str]:
+    """Textos de las cajas que pasan los filtros, en orden de lectura.
+
+    Resultados sin puntuaciones o cajas (o con longitudes que no cuadran) se devuelven tal
+    cual, sin filtrar ni reordenar."""
+    texts = list(res.get("rec_texts") or [])
+    n = len(texts)
+    scores = np.asarray(res.get("rec_scores") or [], dtype=float)
+    boxes = np.asarray(res.get("rec_boxes") or [], dtype=float)
+    if n == 0 or scores.shape != (n,):
+        return [t for t in texts if t]
+
+    keep = scores >= OCR_MIN_SCORE
+    keep &= np.fromiter((bool(t and t.strip()) for t in texts), dtype=bool, count=n)
+    if boxes.shape != (n, 4):
+        return [texts[i] for i in np.flatnonzero(keep)]
+
+    x1, y1, x2, y2 = boxes.T
+    height = y2 - y1
+    keep &= (x2 > x1) & (height >= OCR_MIN_HEIGHT)
+    idx = np.flatnonzero(keep)
+    if idx.size == 0:
+        return []
+
+    # Filas: ordenadas por centro vertical, se abre fila nueva cuando el salto entre dos
+    # centros consecutivos supera una fracción del alto mediano de las líneas
+    cy = (y1[idx] + y2[idx]) / 2
+    by_y = np.argsort(cy, kind="stable")
+    tol = ROW_TOLERANCE * float(np.median(height[idx]))
+    row = np.empty(idx.size, dtype=int)
+    row[by_y] = np.cumsum(np.diff(cy[by_y], prepend=cy[by_y[0]]) > tol)
+    x = -x2[idx] if rtl else x1[idx]
+    return [texts[i] for i in idx[np.lexsort((x, row))]]
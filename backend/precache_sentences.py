@@ -1,6 +1,10 @@
 # precache_sentences.py
 # Uso:
 #   PROG_STEP=500 python precache_sentences.py -i sentences.txt -t es,ko,ja,zh -s en
+#   python precache_sentences.py -g all -t es,ko,ja,zh --shard 0/4   # todo lo que puede devolver `/`
+#   python precache_sentences.py -i sentences.txt -t es,ja -j 16 --inflight 32 --pron-procs 8
+#   python precache_sentences.py -i sentences.txt -t es,ja --journal run.journal   # reanudable
+#   python precache_sentences.py -t es,ja --journal run.journal --retry-failed     # reintenta fallidos
 try:
     import orjson as _json
     dumps = lambda o: _json.dumps(o).decode()
@@ -8,12 +12,18 @@ except Exception:
     import json as _json
     dumps = lambda o: _json.dumps(o, ensure_ascii=False, separators=(",",":"))
 
-import argparse, pathlib, os, time, sys, signal, threading
+import argparse, pathlib, os, time, sys, signal, threading, traceback
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from ipa import pronounce
+from pronpool import PronEngine
+from hotcache import disk_usage
 from app import (
-    cache, cache_key, build_payload, lt_translate, _get_pron,
+    cache, cache_key, build_payload, lt_translate, _get_pron, STORE,
     space_chinese_for_flutter, space_japanese_for_flutter,
-    PRON_POOL, MAX_SENTENCE_LENGTH
+    PRON_POOL, MAX_SENTENCE_LENGTH, EN
 )
+from beginnergen import sentence_space, WORD_SPACES
 
 STOP = threading.Event()
 def _on_sigint(signum, frame):
@@ -22,8 +32,6 @@ def _on_sigint(signum, frame):
     raise KeyboardInterrupt
 signal.signal(signal.SIGINT, _on_sigint)
 
-cache_set = getattr(cache, "set", cache.add)
-
 def _normalize(s: str) -> str:
     s = s[:MAX_SENTENCE_LENGTH]
     return " ".join(s.split()) if ("  " in s or "\n" in s or "\t" in s) else s
@@ -34,11 +42,115 @@ def _space_by_lang(s: str, lang: str) -> str:
     if lang.startswith('zh'): return space_chinese_for_flutter(s)
     return s
 
-def _iter_sentences(path: pathlib.Path):
-    with path.open("r", encoding="utf-8") as f:
+# Los iteradores de entrada devuelven (pos, frase): `pos` es el punto desde el que se
+# reanuda justo después de esa frase (offset en bytes para ficheros, ítems para -g).
+
+def _iter_sentences(path: pathlib.Path, pos: int = 0):
+    with path.open("rb") as f:
+        f.seek(pos)
+        for line in iter(f.readline, b""):
+            pos += len(line)
+            s = line.decode("utf-8").strip()
+            if s: yield pos, s
+
+def _iter_generated(tipo: str, shard: str, pos: int = 0):
+    """Recorre el espacio de `/` (frase y/o categorías de palabras), shard k/n de cada uno."""
+    k, n = (int(x) for x in shard.split("/"))
+    tipos = ["frase", *WORD_SPACES] if tipo == "all" else [t.strip() for t in tipo.split(",") if t.strip()]
+    skip = pos
+    for t in tipos:
+        space = sentence_space(t)
+        r = space.shard_range(k, n)
+        if skip >= len(r):
+            skip -= len(r)
+            continue
+        for _, s in space.iter(r.start + skip, r.stop):
+            pos += 1
+            yield pos, s
+        skip = 0
+
+def _iter_failed(path: pathlib.Path, pos: int = 0):
+    with path.open("rb") as f:
         for line in f:
-            s = line.strip()
-            if s: yield s
+            pos += 1
+            try: yield pos, _json.loads(line)["sentence"]
+            except Exception: continue
+
+class _Journal:
+    """Checkpoint compacto de una corrida: hasta qué punto de la entrada está todo hecho,
+    para qué pares de idiomas, y un `.failed` (JSONL) con los ítems que fallaron."""
+    def __init__(self, path: pathlib.Path, source: str, pairs: list, every: int):
+        self.path = path
+        self.failed_path = path.with_name(path.name + ".failed")
+        self.source = source
+        self.pairs = pairs
+        self.every = max(1, every)
+        self.offset = 0   # ítems completados (contiguos)
+        self.pos = 0      # token de reanudación del iterador de entrada
+        self.failed = 0
+        self._since = 0
+
+    def load(self) -> None:
+        try:
+            state = _json.loads(self.path.read_bytes())
+        except FileNotFoundError:
+            return
+        if state.get("source") != self.source:
+            print(f"[JOURNAL] {self.path} es de otra entrada ({state.get('source')}); empezando de cero",
+                  file=sys.stderr, flush=True)
+            return
+        if not set(self.pairs) <= set(state.get("pairs") or []):
+            print(f"[JOURNAL] hay pares nuevos respecto a {self.path}; empezando de cero",
+                  file=sys.stderr, flush=True)
+            return
+        self.offset, self.pos = int(state.get("offset", 0)), int(state.get("pos", 0))
+        self.failed = int(state.get("failed", 0))
+        print(f"[JOURNAL] reanudando desde el ítem {self.offset} (pos={self.pos}, fallidos={self.failed})",
+              file=sys.stderr, flush=True)
+
+    def advance(self, pos: int) -> None:
+        self.offset += 1
+        self.pos = pos
+        self._since += 1
+        if self._since >= self.every:
+            self.save()
+
+    def fail(self, sentence: str, err: BaseException) -> None:
+        self.failed += 1
+        with self.failed_path.open("ab") as f:
+            f.write(dumps({"offset": self.offset, "sentence": sentence,
+                           "error": f"{err.__class__.__name__}: {err}"}).encode() + b"\n")
+
+    def save(self) -> None:
+        self._since = 0
+        state = {"source": self.source, "pairs": self.pairs, "offset": self.offset,
+                 "pos": self.pos, "failed": self.failed, "updated": time.time()}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(dumps(state), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+class _Stages:
+    """Contadores por etapa (lt, pron, write, hit, fail) para reportar ops/s de cada una."""
+    def __init__(self):
+        self.t0 = time.time()
+        self.counts = {"lt": 0, "pron": 0, "write": 0, "hit": 0, "fail": 0}
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[stage] += n
+
+    def finish_one(self) -> int:
+        with self._lock:
+            self.done += 1
+            return self.done
+
+    def line(self) -> str:
+        dt = max(1e-6, time.time() - self.t0)
+        with self._lock:
+            rates = "  ".join(f"{k}={v} ({v/dt:6.2f} ops/s)" for k, v in self.counts.items())
+            return f"{self.done} frases  {rates}"
 
 def _humanize_bytes(n: int) -> str:
     size = float(n)
@@ -49,182 +161,238 @@ def _humanize_bytes(n: int) -> str:
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("-i","--input", required=True)
+    src_group = ap.add_mutually_exclusive_group()
+    src_group.add_argument("-i","--input")
+    src_group.add_argument("-g","--generate",
+                           help="frase, sujeto, verbo, color, familia, adjetivo, direccion (separados por coma) o all")
+    ap.add_argument("--shard", default="0/1", help="k/n: con -g procesa solo el shard k de n")
     ap.add_argument("-t","--targets", required=True)
     ap.add_argument("-s","--source", default="en")
+    ap.add_argument("-j","--jobs", type=int, default=1, help="frases procesadas a la vez")
+    ap.add_argument("--inflight", type=int, default=0, help="máximo de peticiones a LTEngine en vuelo (0 = --jobs)")
+    ap.add_argument("--pron-procs", type=int, default=-1,
+                    help="procesos para IPA/romanización (0 = en el mismo hilo; por defecto todos los núcleos si -j > 1)")
+    ap.add_argument("--journal", help="checkpoint para reanudar la corrida; los fallidos van a <journal>.failed")
+    ap.add_argument("--retry-failed", action="store_true", help="procesa solo los ítems de <journal>.failed")
     args = ap.parse_args()
+    if args.retry_failed and not args.journal:
+        ap.error("--retry-failed necesita --journal")
+    if not (args.input or args.generate or args.retry_failed):
+        ap.error("hace falta -i, -g o --retry-failed")
 
-    in_path = pathlib.Path(args.input)
     targets = tuple(t.strip().lower() for t in args.targets.split(",") if t.strip())
     src     = args.source.strip().lower()
 
     PROG_STEP = int(os.getenv("PROG_STEP", "100"))  # imprime cada N procesados
 
-    hit_count = 0
-    done_count = 0
-    t0 = time.time()
+    journal = None
+    if args.journal:
+        pairs = sorted({f"{src}>{t}" for t in targets} | {f"{a}>{b}" for a in targets for b in targets if a != b})
+        source_id = f"gen:{args.generate}:{args.shard}" if args.generate else (
+            f"file:{pathlib.Path(args.input).resolve()}" if args.input else "")
+        journal = _Journal(pathlib.Path(args.journal), source_id, pairs, every=PROG_STEP)
+    resume = journal is not None and not args.retry_failed
+
+    retry_items = []
+    if args.retry_failed:
+        # Se leen todos y se vacía el fichero: lo que vuelva a fallar se escribe de nuevo
+        if journal.failed_path.exists():
+            retry_items = list(_iter_failed(journal.failed_path))
+            journal.failed_path.unlink()
+        sentences = iter(retry_items)
+        normalize = lambda s: s  # en .failed ya está normalizada
+    elif args.generate:
+        if resume: journal.load()
+        # `/` usa la frase tal cual como clave: no se recorta a MAX_SENTENCE_LENGTH
+        sentences = _iter_generated(args.generate, args.shard, journal.pos if resume else 0)
+        normalize = lambda s: s
+    else:
+        if resume: journal.load()
+        sentences = _iter_sentences(pathlib.Path(args.input), journal.pos if resume else 0)
+        normalize = _normalize
+
+    jobs = max(1, args.jobs)
+    inflight = args.inflight if args.inflight > 0 else jobs
+    pron_procs = args.pron_procs if args.pron_procs >= 0 else ((os.cpu_count() or 1) if jobs > 1 else 0)
+
+    # El pool de procesos se crea (y arranca) antes que cualquier hilo: con fork, los hijos
+    # no heredan ningún lock tomado. Los modelos de ipa son perezosos y aquí aún no hay
+    # ninguno cargado: cada worker carga los suyos en su initializer (ipa.warmup).
+    pron_pool = None
+    if pron_procs > 0:
+        pron_pool = PronEngine(pron_procs, start_method="spawn" if sys.platform == "win32" else "fork")
+        pron_pool.warm()
+    lt_pool = ThreadPoolExecutor(max_workers=inflight, thread_name_prefix="lt")
+    workers = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="frase")
+
+    stats = _Stages()
+
+    def _pron_fn(text, lang):
+        if pron_pool is None:
+            return pronounce(text, lang)
+        return pron_pool.pronounce(text, lang)
+
+    def _pron(text, lang, memo):
+        key = (text, lang)
+        if key not in memo:
+            kpron = cache_key(text, lang, f"pron:{lang}")
+            memo[key] = _get_pron(cache, kpron, text, lang, pron_fn=_pron_fn)
+            stats.add("pron")
+        return memo[key]
+
+    def _lt(text, s_lang, t_lang) -> Future:
+        return lt_pool.submit(lt_translate, text, s_lang, t_lang)
 
-    # Procesar 1×1 (solo singles)
-    for s in _iter_sentences(in_path):
-        if STOP.is_set(): break
-        ns = _normalize(s)
-        o_disp = _space_by_lang(ns, src)
+    def _store_pair(key_text, o_disp, t_disp, s_lang, t_lang, oIpa, tIpa, oRom, tRom, pivot=None):
+        # v1: forward + reverse + rev:; v2: los dos registros enlazados
+        STORE.put(build_payload(o_disp, t_disp, s_lang, t_lang, oIpa, tIpa, oRom, tRom),
+                  key_text=key_text, pivot=pivot, reverse=pivot is None)
+        stats.add("write")
 
-        # IPA del ORIGINAL una sola vez por frase (caché local)
-        o_pron = None
-        def _get_o_pron():
-            nonlocal o_pron
-            if o_pron is None:
-                k_o = cache_key(o_disp, src, f"pron:{src}")
-                o_pron = _get_pron(cache, k_o, o_disp, src)
-            return o_pron
+    def _process(ns: str) -> bool:
+        """True si la frase quedó completa; False si se abandonó por una interrupción."""
+        o_disp = _space_by_lang(ns, src)
+        # caché local de IPA por texto/idioma durante esta frase
+        memo = {}
 
         # Guardamos traducciones de ESTA frase por destino para pivotar luego
         translations = {}  # tgt -> texto traducido (espaciado)
+        misses = []
 
         for tgt in targets:
-            if STOP.is_set(): break
-            k = cache_key(ns, src, tgt)
-            hit = cache.get(k)
-
-            # --------- HIT (aunque incompleto): NO golpear motor ---------
-            if isinstance(hit, dict) and ("translatedText" in hit):
-                t_cached = hit.get("translatedText") or ""
-                if not t_cached:
-                    rev = cache.get("rev:" + cache_key(o_disp, src, tgt))
-                    if isinstance(rev, dict):
-                        t_cached = rev.get("orig_text") or ""
-
-                t_disp = _space_by_lang(t_cached, tgt)
-                if t_disp:
-                    translations[tgt] = t_disp
-
-                need_enrich = not all(x in hit for x in (
-                    "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-                ))
-                if need_enrich and t_disp:
-                    back = None
-                    rev = cache.get("rev:" + cache_key(o_disp, src, tgt))
-                    if isinstance(rev, dict) and isinstance(rev.get("payload_key"), str):
-                        back = cache.get(rev["payload_key"])
-
-                    if isinstance(back, dict) and all(kx in back for kx in (
-                        "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-                    )):
-                        # swap IPA desde reverse
-                        oIpa, oRom = back["translatedIpa"], back["translatedRomanization"]
-                        tIpa, tRom = back["originalIpa"],   back["originalRomanization"]
-                    else:
-                        oIpa, oRom = _get_o_pron()
-                        k_t = cache_key(t_disp, tgt, f"pron:{tgt}")
-                        tIpa, tRom = _get_pron(cache, k_t, t_disp, tgt)
-
-                    payload = build_payload(o_disp, t_disp, src, tgt, oIpa, tIpa, oRom, tRom)
-                    cache_set(k, payload)
-                    k_rev = cache_key(t_disp, tgt, src)
-                    payload_rev = build_payload(t_disp, o_disp, tgt, src, tIpa, oIpa, tRom, oRom)
-                    cache_set(k_rev, payload_rev)
-                    cache_set("rev:"+cache_key(o_disp, src, tgt), {"payload_key": k_rev, "orig_text": t_disp})
-
-                hit_count += 1
+            if STOP.is_set(): return False
+            hit = STORE.payload(ns, src, tgt, follow_rev=False)
+            if hit is not None:
+                if hit.get("translatedText"):
+                    translations[tgt] = hit["translatedText"]
+                stats.add("hit")
                 continue
 
-            # --------- MISS: traducir 1x1 y cachear (forward + reverse + rev:) ---------
-            d = lt_translate(ns, src, tgt)
-            t_raw = (d.get("translatedText") or "")
-            t_disp = _space_by_lang(t_raw, tgt)
-            translations[tgt] = t_disp
-
-            oIpa, oRom = _get_o_pron()
-            k_t = cache_key(t_disp, tgt, f"pron:{tgt}")
-            tIpa, tRom = _get_pron(cache, k_t, t_disp, tgt)
+            # --------- MISS: se lanzan todos los destinos a la vez ---------
+            # Si solo está la respuesta cruda de LTEngine, lt_translate la saca de la caché
+            misses.append((tgt, _lt(ns, src, tgt)))
 
-            payload = build_payload(o_disp, t_disp, src, tgt, oIpa, tIpa, oRom, tRom)
-            cache_set(k, payload)
-            k_rev = cache_key(t_disp, tgt, src)
-            payload_rev = build_payload(t_disp, o_disp, tgt, src, tIpa, oIpa, tRom, oRom)
-            cache_set(k_rev, payload_rev)
-            cache_set("rev:"+cache_key(o_disp, src, tgt), {"payload_key": k_rev, "orig_text": t_disp})
+        for tgt, fut in misses:
+            d = fut.result()
+            stats.add("lt")
+            t_disp = _space_by_lang((d.get("translatedText") or ""), tgt)
+            translations[tgt] = t_disp
 
-            done_count += 1
-            if (done_count % PROG_STEP) == 0:
-                rate = done_count / max(1e-6, (time.time()-t0))
-                print(
-                    f"[PROG] {done_count}  {rate:6.2f} ops/s",
-                    file=sys.stderr, flush=True
-                )
+            oIpa, oRom = _pron(o_disp, src, memo)
+            tIpa, tRom = _pron(t_disp, tgt, memo)
+            _store_pair(ns, o_disp, t_disp, src, tgt, oIpa, tIpa, oRom, tRom)
 
-        if STOP.is_set(): break
+        if STOP.is_set(): return False
 
         # --------- FASE 2: traducir ENTRE destinos usando pivotes existentes ---------
         langs = [lg for lg in targets if lg in translations]
-        # caché local de IPA por texto/idioma durante esta frase
-        pron_cache = {}
-        def _pron(text, lang):
-            key = (text, lang)
-            if key in pron_cache: return pron_cache[key]
-            kpron = cache_key(text, lang, f"pron:{lang}")
-            pron_cache[key] = _get_pron(cache, kpron, text, lang)
-            return pron_cache[key]
-
-        for i, li in enumerate(langs):
-            if STOP.is_set(): break
+        misses = []
+        for li in langs:
             oi_disp = translations[li]
             for lj in langs:
-                if STOP.is_set(): break
+                if STOP.is_set(): return False
                 if lj == li: continue
 
-                kx = cache_key(oi_disp, li, lj)
-                hit = cache.get(kx)
-                if isinstance(hit, dict) and ("translatedText" in hit):
-                    # enrich si falta IPA
-                    need_enrich = not all(x in hit for x in (
-                        "originalIpa","translatedIpa","originalRomanization","translatedRomanization"
-                    ))
-                    if need_enrich:
-                        tj = hit.get("translatedText") or ""
-                        tj_disp = _space_by_lang(tj, lj)
-                        if tj_disp:
-                            oIpa, oRom = _pron(oi_disp, li)
-                            tIpa, tRom = _pron(tj_disp, lj)
-                            payload = build_payload(oi_disp, tj_disp, li, lj, oIpa, tIpa, oRom, tRom)
-                            cache_set(kx, payload)
-                            k_revx = cache_key(tj_disp, lj, li)
-                            payload_rev = build_payload(tj_disp, oi_disp, lj, li, tIpa, oIpa, tRom, oRom)
-                            cache_set(k_revx, payload_rev)
-                            cache_set("rev:"+cache_key(oi_disp, li, lj), {"payload_key": k_revx, "orig_text": tj_disp})
-                    hit_count += 1
+                if STORE.payload(oi_disp, li, lj, follow_rev=False) is not None:
+                    stats.add("hit")
                     continue
 
-                dx = lt_translate(oi_disp, li, lj)
-                tj_disp = _space_by_lang((dx.get("translatedText") or ""), lj)
-
-                oIpa, oRom = _pron(oi_disp, li)
-                tIpa, tRom = _pron(tj_disp, lj)
-
-                payload = build_payload(oi_disp, tj_disp, li, lj, oIpa, tIpa, oRom, tRom)
-                cache_set(kx, payload)
-                k_revx = cache_key(tj_disp, lj, li)
-                payload_rev = build_payload(tj_disp, oi_disp, lj, li, tIpa, oIpa, tRom, oRom)
-                cache_set(k_revx, payload_rev)
-                cache_set("rev:"+cache_key(oi_disp, li, lj), {"payload_key": k_revx, "orig_text": tj_disp})
-
-                done_count += 1
-                if (done_count % PROG_STEP) == 0:
-                    rate = done_count / max(1e-6, (time.time()-t0))
-                    print(f"[PROG XLANG] {done_count}  {rate:6.2f} ops/s", file=sys.stderr, flush=True)
-
-    print(f"Precache terminado. hits={hit_count} done={done_count}")
-    cache_dir = pathlib.Path(".cache")
-    total_bytes = 0
-    if cache_dir.exists():
-        for dp,_,fs in os.walk(cache_dir, followlinks=False):
-            for fn in fs:
+                misses.append((li, lj, oi_disp, _lt(oi_disp, li, lj)))
+
+        for li, lj, oi_disp, fut in misses:
+            dx = fut.result()
+            stats.add("lt")
+            tj_disp = _space_by_lang((dx.get("translatedText") or ""), lj)
+
+            oIpa, oRom = _pron(oi_disp, li, memo)
+            tIpa, tRom = _pron(tj_disp, lj, memo)
+            _store_pair(oi_disp, oi_disp, tj_disp, li, lj, oIpa, tIpa, oRom, tRom)
+
+        # --------- FASE 3 (solo -g): claves que arma `/` pivotando desde inglés ---------
+        # `/` con originalLanguage=li y target=lj guarda la frase en inglés pivotada a li y lj
+        # (en v2, registros enlazados al pivote); ya las tenemos todas, no hace falta el motor.
+        if args.generate and src == EN and not STOP.is_set():
+            pool = {src: o_disp, **{lg: translations[lg] for lg in langs}}
+            for li, oi_disp in pool.items():
+                for lj, tj_disp in pool.items():
+                    if li == src and lj != src: continue  # ya cubierto en la fase 1
+                    if STORE.pivot_payload(ns, src, li, lj) is not None:
+                        stats.add("hit")
+                        continue
+                    oIpa, oRom = _pron(oi_disp, li, memo)
+                    tIpa, tRom = _pron(tj_disp, lj, memo)
+                    _store_pair(ns, oi_disp, tj_disp, li, lj, oIpa, tIpa, oRom, tRom, pivot=(src, ns))
+        return not STOP.is_set()
+
+    interrupted = False
+    def _collect(item) -> None:
+        nonlocal interrupted
+        pos, ns, fut = item
+        try:
+            completed = fut.result()
+        except Exception as e:
+            if journal is None: raise
+            journal.fail(ns, e)
+            stats.add("fail")
+            print(f"[FAIL] {ns!r}: {e.__class__.__name__}: {e}", file=sys.stderr, flush=True)
+            completed = True  # queda en .failed; la reanudación no lo repite
+        if not completed:
+            interrupted = True
+            if args.retry_failed: journal.fail(ns, RuntimeError("interrumpido"))
+            return
+        # El checkpoint solo avanza por ítems contiguos: uno interrumpido lo congela
+        if resume and not interrupted:
+            journal.advance(pos)
+        if (stats.finish_one() % PROG_STEP) == 0:
+            print(f"[PROG] {stats.line()}", file=sys.stderr, flush=True)
+
+    # Se mantienen como mucho 2×jobs frases pendientes para no leer toda la entrada a memoria
+    pending: deque = deque()
+    try:
+        for pos, s in sentences:
+            if STOP.is_set(): break
+            ns = normalize(s)
+            pending.append((pos, ns, workers.submit(_process, ns)))
+            if len(pending) >= 2 * jobs:
+                wait([pending[0][2]])  # si llega SIGINT aquí, el ítem sigue en `pending`
+                _collect(pending.popleft())
+        while pending:
+            wait([pending[0][2]])
+            _collect(pending.popleft())
+    except BaseException:
+        STOP.set()  # interrumpido: los workers abandonan su frase actual
+        raise
+    finally:
+        workers.shutdown(wait=True, cancel_futures=True)
+        lt_pool.shutdown(wait=True, cancel_futures=True)
+        if pron_pool is not None:
+            pron_pool.shutdown()
+        if journal is not None:
+            for item in pending:
                 try:
-                    total_bytes += os.stat(os.path.join(dp, fn), follow_symlinks=False).st_size
-                except:
-                    pass
-    print(f".cache size: {total_bytes} bytes ({_humanize_bytes(total_bytes)})")
+                    if item[2].done() and not item[2].cancelled() and item[2].result():
+                        if resume and not interrupted: journal.advance(item[0])
+                        continue
+                except Exception as e:
+                    journal.fail(item[1], e)
+                    if resume and not interrupted: journal.advance(item[0])
+                    continue
+                interrupted = True
+                if args.retry_failed: journal.fail(item[1], RuntimeError("interrumpido"))
+            if args.retry_failed:
+                for _, s in sentences:  # lo que no llegó a lanzarse sigue pendiente
+                    journal.fail(s, RuntimeError("interrumpido"))
+            if resume:
+                journal.save()
+                print(f"[JOURNAL] guardado en {journal.path}: offset={journal.offset} fallidos={journal.failed}",
+                      file=sys.stderr, flush=True)
+
+    print(f"Precache terminado. {stats.line()}")
+    total_bytes = cache.volume()
+    print(f"{cache.directory} size: {total_bytes} bytes ({_humanize_bytes(total_bytes)}), "
+          f"límite {_humanize_bytes(cache.size_limit)} ({cache.eviction_policy})")
+    for ns, u in disk_usage(cache.disk).items():
+        print(f"  {ns:<6} {u['items']:>9} entradas  {_humanize_bytes(u['bytes'])}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,72 @@
+# pronpool.py
+# Pool de procesos para la pronunciación (IPA/romanización). ipa.pronounce es CPU puro
+# (MeCab, jieba, pykakasi, g2pk2, epitran, espeak) y en hilos el GIL lo serializa; aquí
+# cada worker carga los modelos una sola vez al arrancar y atiende peticiones por IPC.
+#
+# Protocolo: petición (texto, idioma) -> respuesta (ipa: list[str], roman: list[str]),
+# serializado con pickle por las pipes de ProcessPoolExecutor.
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple
+import multiprocessing, threading
+
+def _init_worker() -> None:
+    import ipa
+    ipa.warmup()
+
+def _pronounce(text: str, lang: str) -> Tuple[List[str], List[str]]:
+    from ipa import pronounce
+    pr = pronounce(text, lang)
+    return pr.ipa, pr.roman
+
+class PronEngine:
+    def __init__(self, procs: int, start_method: str = "spawn"):
+        self.procs = procs
+        self.start_method = start_method
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.procs,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+        )
+
+    def _submit(self, text: str, lang: str) -> Tuple[ProcessPoolExecutor, Future]:
+        # Bajo el lock: nunca se manda trabajo a un pool que _reset está reemplazando
+        with self._lock:
+            try:
+                return self._pool, self._pool.submit(_pronounce, text, lang)
+            except BrokenProcessPool:
+                # ya estaba roto antes de mandar nada: se rehace aquí mismo
+                self._pool = self._new_pool()
+                return self._pool, self._pool.submit(_pronounce, text, lang)
+
+    def submit(self, text: str, lang: str) -> Future:
+        return self._submit(text, lang)[1]
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is broken:
+                self._pool = self._new_pool()
+
+    def pronounce(self, text: str, lang: str):
+        from ipa import Pronunciation
+        for attempt in range(2):
+            pool, fut = self._submit(text, lang)
+            try:
+                ipa_, roman = fut.result()
+                return Pronunciation(roman=roman, ipa=ipa_)
+            except BrokenProcessPool:
+                # Un worker murió (OOM, segfault en una extensión C): se rehace el pool una vez
+                if attempt: raise
+                self._reset(pool)
+
+    def warm(self) -> None:
+        """Arranca todos los workers (y sus modelos) sin esperar a la primera petición."""
+        for f in [self.submit("", "en") for _ in range(self.procs)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
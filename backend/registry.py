@@ -0,0 +1,105 @@
+# registry.py
+# Registro de modelos pesados (OCR, MeCab, kakasi, g2pk2, epitran, jieba, espeak...).
+# Nada se construye al importar: cada modelo se carga la primera vez que se usa (una sola
+# vez aunque lleguen varios hilos a la vez). Opcionalmente se pueden precargar en segundo
+# plano al arrancar y consultar qué subsistemas están listos (/ready).
+from typing import Any, Callable, Dict, Iterable, Optional
+import threading, time
+
+COLD, LOADING, READY, FAILED = "cold", "loading", "ready", "failed"
+
+class _Entry:
+    __slots__ = ("factory", "value", "state", "error", "seconds", "lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.value: Any = None
+        self.state = COLD
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+class Lazy:
+    """Sustituto de un objeto global: resuelve el modelo en el registro al primer uso."""
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: "Registry", name: str):
+        self._registry = registry
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        return self._registry.get(self._name)(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<Lazy {self._name} ({self._registry.state(self._name)})>"
+
+class Registry:
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._warming: set = set()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> Lazy:
+        self._entries.setdefault(name, _Entry(factory))
+        return Lazy(self, name)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.value
+        with entry.lock:
+            if entry.state != READY:
+                entry.state, entry.error = LOADING, None
+                t0 = time.perf_counter()
+                try:
+                    entry.value = entry.factory()
+                except BaseException as e:
+                    entry.state, entry.error = FAILED, f"{type(e).__name__}: {e}"
+                    raise
+                entry.seconds = round(time.perf_counter() - t0, 3)
+                entry.state = READY
+        return entry.value
+
+    def state(self, name: str) -> str:
+        return self._entries[name].state
+
+    def names(self) -> list:
+        return list(self._entries)
+
+    def _select(self, names: Optional[Iterable[str]]) -> list:
+        return self.names() if names is None else [n for n in names if n in self._entries]
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> None:
+        for name in self._select(names):
+            try:
+                self.get(name)
+            except Exception:
+                pass  # queda en FAILED con el error en status()
+
+    def warm_async(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        selected = self._select(names)
+        self._warming.update(selected)
+        th = threading.Thread(target=self.warm, args=(selected,), name="model-warmup", daemon=True)
+        th.start()
+        return th
+
+    def status(self) -> dict:
+        return {name: {"state": e.state, "seconds": e.seconds, "error": e.error}
+                for name, e in self._entries.items()}
+
+    def ready(self) -> bool:
+        """True cuando todo lo pedido en warm_async() terminó de cargar."""
+        return all(self._entries[n].state == READY for n in self._warming)
+
+MODELS = Registry()
+
+def parse_warmup(value: Optional[str]) -> Optional[list]:
+    """WARMUP=0/vacío -> nada ([]), 1/all -> todo (None), o una lista 'ocr,ja_tagger'."""
+    v = (value or "").strip().lower()
+    if v in ("", "0", "false", "no"):
+        return []
+    if v in ("1", "all", "true", "yes"):
+        return None
+    return [n.strip() for n in v.split(",") if n.strip()]